@@ -0,0 +1,262 @@
+# app/aggregates.py
+"""
+Per-floor and per-building counters for the dashboards.
+
+For every floor it has seen, Aggregates keeps the number of occupants, placed
+objects by o_type and the cells they cover. The counters are loaded once per
+floor (one batched query per table for a whole building) and then updated by
+the spatial hooks, so a summary costs O(floors) instead of reading every
+personnel and object row.
+
+The updates are exact because each tracked personnel and object remembers the
+floor it counts on: a move subtracts from the old floor and adds to the new
+one, and replaying a change twice has no effect. A reconciliation job reloads
+the tracked floors every AGGREGATES_RECONCILE_INTERVAL seconds, which also
+picks up writes handled by other workers, and reports how many floors had
+drifted.
+"""
+import asyncio
+import logging
+import time
+from typing import Optional
+from app.config import AGGREGATES_RECONCILE_INTERVAL
+from app.pagination import iter_rows
+from app import spatial
+
+class FloorTotals:
+    def __init__(self, floor: dict):
+        self.floor_id = floor["id"]
+        self.building_id = floor.get("building_id")
+        self.number = floor.get("number")
+        self.area = (floor.get("width") or 0) * (floor.get("length") or 0)
+        self.capacity = floor.get("capacity")
+        self.personnel = set()   # ids of the personnel on this floor
+        self.objects = {}        # object id -> (o_type, covered cells)
+        self.object_types = {}   # o_type -> count
+        self.covered_cells = 0
+
+    def add_object(self, object_id: int, o_type: int, cells: int):
+        self.objects[object_id] = (o_type, cells)
+        self.object_types[o_type] = self.object_types.get(o_type, 0) + 1
+        self.covered_cells += cells
+
+    def remove_object(self, object_id: int):
+        o_type, cells = self.objects.pop(object_id)
+        self.object_types[o_type] -= 1
+        if not self.object_types[o_type]:
+            del self.object_types[o_type]
+        self.covered_cells -= cells
+
+    def counts(self) -> tuple:
+        return len(self.personnel), len(self.objects), self.covered_cells, sorted(self.object_types.items())
+
+    def summary(self) -> dict:
+        return {
+            "id": self.floor_id,
+            "building_id": self.building_id,
+            "number": self.number,
+            "area": self.area,
+            "capacity": self.area if self.capacity is None else self.capacity,
+            "occupantCount": len(self.personnel),
+            "objectCount": len(self.objects),
+            "objectsByType": {str(o_type): n for o_type, n in sorted(self.object_types.items())},
+            "coveredCells": self.covered_cells,
+            "freeCells": max(0, self.area - self.covered_cells),
+        }
+
+def _cells(row: dict) -> int:
+    return (row.get("width") or 1) * (row.get("length") or 1)
+
+class Aggregates:
+    def __init__(self):
+        self.floors = {}           # floor_id -> FloorTotals
+        self.personnel_floor = {}  # personnel id -> floor_id, for tracked floors only
+        self.object_floor = {}     # object id -> floor_id, for tracked floors only
+        self.reconciliations = 0
+        self.drifted = 0           # Floors whose counters differed at the last reconciliation
+        self.reconciled_at = None
+        self._lock = asyncio.Lock()
+        self._pending = None       # Changes seen while a load is reading, replayed after it
+
+    # Incremental updates
+
+    def apply(self, floor_id: Optional[int], change: dict):
+        """Listener for spatial.change_listeners."""
+        if self._pending is not None:
+            self._pending.append((floor_id, change))
+        kind = change["type"]
+        if kind == "personnel.moved":
+            self._move_personnel(change["id"], floor_id)
+        elif kind == "personnel.removed":
+            if self.personnel_floor.get(change["id"]) == floor_id:
+                self._move_personnel(change["id"], None)
+        elif kind == "object.saved":
+            row = change["object"]
+            self._remove_object(row["id"])
+            totals = self.floors.get(row.get("floor_id"))
+            if totals is not None:
+                totals.add_object(row["id"], row.get("o_type"), _cells(row))
+                self.object_floor[row["id"]] = totals.floor_id
+        elif kind == "object.deleted":
+            if self.object_floor.get(change["id"]) == floor_id:
+                self._remove_object(change["id"])
+        elif kind == "floor.changed":
+            # Resized or deleted: reloaded on next use
+            self._drop(floor_id)
+
+    def _move_personnel(self, personnel_id: int, floor_id: Optional[int]):
+        old = self.personnel_floor.pop(personnel_id, None)
+        if old is not None:
+            self.floors[old].personnel.discard(personnel_id)
+        totals = self.floors.get(floor_id)
+        if totals is not None:
+            totals.personnel.add(personnel_id)
+            self.personnel_floor[personnel_id] = floor_id
+
+    def _remove_object(self, object_id: int):
+        old = self.object_floor.pop(object_id, None)
+        if old is not None:
+            self.floors[old].remove_object(object_id)
+
+    def _drop(self, floor_id: int):
+        totals = self.floors.pop(floor_id, None)
+        if totals is None:
+            return
+        for personnel_id in totals.personnel:
+            self.personnel_floor.pop(personnel_id, None)
+        for object_id in totals.objects:
+            self.object_floor.pop(object_id, None)
+
+    def _install(self, totals: FloorTotals):
+        self.floors[totals.floor_id] = totals
+        for personnel_id in totals.personnel:
+            self._move_personnel(personnel_id, totals.floor_id)
+        for object_id in totals.objects:
+            old = self.object_floor.get(object_id)
+            if old is not None and old != totals.floor_id:
+                self.floors[old].remove_object(object_id)
+            self.object_floor[object_id] = totals.floor_id
+
+    # Loading
+
+    async def _read(self, floor_ids: list) -> dict:
+        """Count the given floors from the database; returns floor_id -> FloorTotals."""
+        where = lambda query: query.in_("floor_id", floor_ids)
+
+        async def collect(table_name: str, fields: str, where):
+            return [row async for row in iter_rows(table_name, fields, where)]
+
+        floors, personnel, objects = await asyncio.gather(
+            collect("Floors", "id,building_id,number,width,length,capacity", lambda query: query.in_("id", floor_ids)),
+            collect("Personnels", "id,floor_id", where),
+            collect("Objects", "id,floor_id,o_type,width,length", where),
+        )
+        totals = {f["id"]: FloorTotals(f) for f in floors}
+        for p in personnel:
+            if p["floor_id"] in totals:
+                totals[p["floor_id"]].personnel.add(p["id"])
+        for o in objects:
+            if o["floor_id"] in totals:
+                totals[o["floor_id"]].add_object(o["id"], o.get("o_type"), _cells(o))
+        return totals
+
+    async def _load(self, floor_ids: list) -> int:
+        """(Re)load floors, replaying the changes made while reading. Returns the number that drifted."""
+        self._pending = []
+        try:
+            totals = await self._read(floor_ids)
+        finally:
+            pending, self._pending = self._pending, None
+
+        drifted = 0
+        for floor_id in floor_ids:
+            old = self.floors.get(floor_id)
+            self._drop(floor_id)
+            new = totals.get(floor_id)
+            if new is None:
+                continue  # Deleted
+            if old is not None and old.counts() != new.counts():
+                drifted += 1
+            self._install(new)
+        for floor_id, change in pending:
+            self.apply(floor_id, change)
+        return drifted
+
+    async def ensure(self, floor_ids: list):
+        """Load the floors among floor_ids that aren't tracked yet, in one batch."""
+        if all(floor_id in self.floors for floor_id in floor_ids):
+            return
+        async with self._lock:
+            missing = [floor_id for floor_id in floor_ids if floor_id not in self.floors]
+            if missing:
+                await self._load(missing)
+
+    async def reconcile(self) -> dict:
+        """Recount every tracked floor from the database."""
+        async with self._lock:
+            started = time.perf_counter()
+            floor_ids = list(self.floors)
+            self.drifted = await self._load(floor_ids) if floor_ids else 0
+            self.reconciliations += 1
+            self.reconciled_at = time.time()
+            return {"floors": len(floor_ids), "drifted": self.drifted,
+                    "elapsedMs": round((time.perf_counter() - started) * 1000, 2)}
+
+    async def run_reconciliation(self, interval: float = AGGREGATES_RECONCILE_INTERVAL):
+        """Background job: reconcile every `interval` seconds until cancelled."""
+        while True:
+            await asyncio.sleep(interval)
+            try:
+                result = await self.reconcile()
+                if result["drifted"]:
+                    logging.warning(f"Aggregates reconciliation corrected {result['drifted']} floor(s)")
+            except Exception as e:
+                logging.error(f"Aggregates reconciliation failed: {str(e)}")
+
+    # Queries
+
+    async def floor_summary(self, floor_id: int) -> Optional[dict]:
+        await self.ensure([floor_id])
+        totals = self.floors.get(floor_id)
+        return totals.summary() if totals is not None else None
+
+    async def floor_personnel(self, floor_id: int) -> Optional[set]:
+        """Ids of the personnel on a floor, or None if the floor doesn't exist."""
+        await self.ensure([floor_id])
+        totals = self.floors.get(floor_id)
+        return set(totals.personnel) if totals is not None else None
+
+    async def building_summary(self, building_id: int, floor_ids: list) -> dict:
+        await self.ensure(floor_ids)
+        floors = sorted(
+            (self.floors[floor_id].summary() for floor_id in floor_ids if floor_id in self.floors),
+            key=lambda f: (f["number"] or 0, f["id"]),
+        )
+        objects_by_type = {}
+        for f in floors:
+            for o_type, n in f["objectsByType"].items():
+                objects_by_type[o_type] = objects_by_type.get(o_type, 0) + n
+        return {
+            "building_id": building_id,
+            "floorCount": len(floors),
+            "area": sum(f["area"] for f in floors),
+            "capacity": sum(f["capacity"] for f in floors),
+            "occupantCount": sum(f["occupantCount"] for f in floors),
+            "objectCount": sum(f["objectCount"] for f in floors),
+            "objectsByType": objects_by_type,
+            "freeCells": sum(f["freeCells"] for f in floors),
+            "floors": floors,
+        }
+
+    def stats(self) -> dict:
+        return {
+            "floors": len(self.floors),
+            "personnel": len(self.personnel_floor),
+            "objects": len(self.object_floor),
+            "reconciliations": self.reconciliations,
+            "drifted": self.drifted,
+            "reconciledAt": self.reconciled_at,
+        }
+
+aggregates = Aggregates()
+spatial.change_listeners.append(aggregates.apply)
@@ -0,0 +1,125 @@
+# app/auth.py
+"""
+Password hashing and stateless JWT sessions.
+
+/login-personnel checks a PBKDF2-hashed password once and issues an HS256
+token signed with SUPABASE_JWT_SECRET. Endpoints that depend on
+current_claims then verify the token locally: no database round trip, and
+tokens seen recently skip even the signature check through a small LRU of
+verified claims (entries still expire with the token). Only tokens issued by
+create_token are accepted: the anon/service_role keys and Supabase Auth tokens
+are signed with the same secret but lack its issuer and role.
+
+Passwords stored before hashing was introduced (plain text) still verify,
+and are replaced by a hash on the next successful login.
+"""
+import base64
+import hashlib
+import hmac
+import os
+import threading
+import time
+from collections import OrderedDict
+from typing import Optional
+from fastapi import Depends, HTTPException
+from fastapi.security import HTTPAuthorizationCredentials, HTTPBearer
+from jose import jwt, JWTError
+from app.config import SUPABASE_JWT_SECRET, TOKEN_TTL, TOKEN_CACHE_SIZE, PASSWORD_HASH_ITERATIONS
+
+ALGORITHM = "HS256"
+TOKEN_ISSUER = "hackmetu"
+TOKEN_ROLE = "personnel"
+HASH_PREFIX = "pbkdf2_sha256"
+
+def hash_password(password: str, iterations: int = PASSWORD_HASH_ITERATIONS) -> str:
+    """Return "pbkdf2_sha256$<iterations>$<salt>$<hash>" for a password."""
+    salt = os.urandom(16)
+    digest = hashlib.pbkdf2_hmac("sha256", password.encode(), salt, iterations)
+    return "$".join([HASH_PREFIX, str(iterations), base64.b64encode(salt).decode(), base64.b64encode(digest).decode()])
+
+def is_hashed(stored: Optional[str]) -> bool:
+    return bool(stored) and stored.startswith(HASH_PREFIX + "$")
+
+def verify_password(password: str, stored: Optional[str]) -> bool:
+    if not stored:
+        return False
+    if not is_hashed(stored):
+        # Legacy plain-text password
+        return hmac.compare_digest(password.encode(), stored.encode())
+    _, iterations, salt, expected = stored.split("$")
+    digest = hashlib.pbkdf2_hmac("sha256", password.encode(), base64.b64decode(salt), int(iterations))
+    return hmac.compare_digest(digest, base64.b64decode(expected))
+
+def without_password(row: dict) -> dict:
+    """A Personnels or Admins row as returned to clients."""
+    return {k: v for k, v in row.items() if k != "password"}
+
+def _secret() -> str:
+    if not SUPABASE_JWT_SECRET:
+        raise HTTPException(status_code=500, detail="SUPABASE_JWT_SECRET is not configured")
+    return SUPABASE_JWT_SECRET
+
+def create_token(personnel: dict) -> str:
+    now = int(time.time())
+    claims = {
+        "iss": TOKEN_ISSUER,
+        "sub": str(personnel["id"]),
+        "email": personnel.get("email"),
+        "role": TOKEN_ROLE,
+        "floor_id": personnel.get("floor_id"),
+        "iat": now,
+        "exp": now + TOKEN_TTL,
+    }
+    return jwt.encode(claims, _secret(), algorithm=ALGORITHM)
+
+class TokenVerifier:
+    """Verifies tokens, remembering the claims of the most recently verified ones."""
+
+    def __init__(self, max_entries: int):
+        self.max_entries = max_entries
+        self.hits = 0
+        self.misses = 0
+        self._verified = OrderedDict()  # token -> claims, least recently used first
+        self._lock = threading.Lock()
+
+    def verify(self, token: str) -> dict:
+        with self._lock:
+            claims = self._verified.get(token)
+            if claims is not None:
+                if claims.get("exp", 0) > time.time():
+                    self.hits += 1
+                    self._verified.move_to_end(token)
+                    return claims
+                del self._verified[token]
+            self.misses += 1
+
+        # The signature check runs outside the lock
+        try:
+            claims = jwt.decode(
+                token, _secret(), algorithms=[ALGORITHM], issuer=TOKEN_ISSUER,
+                options={"verify_aud": False, "require_iss": True, "require_sub": True, "require_exp": True},
+            )
+        except JWTError as e:
+            raise HTTPException(status_code=401, detail=f"Invalid token: {str(e)}",
+                                headers={"WWW-Authenticate": "Bearer"})
+        if claims.get("role") != TOKEN_ROLE:
+            raise HTTPException(status_code=401, detail="Invalid token: not a personnel session",
+                                headers={"WWW-Authenticate": "Bearer"})
+        with self._lock:
+            self._verified[token] = claims
+            if len(self._verified) > self.max_entries:
+                self._verified.popitem(last=False)
+        return claims
+
+verifier = TokenVerifier(TOKEN_CACHE_SIZE)
+bearer = HTTPBearer(auto_error=False)
+
+async def current_claims(credentials: Optional[HTTPAuthorizationCredentials] = Depends(bearer)) -> dict:
+    """
+    Dependency returning the verified claims of the request's bearer token (401
+    without one). Async so it runs on the event loop: a cache hit is a dict
+    lookup and not worth a thread pool hop.
+    """
+    if credentials is None:
+        raise HTTPException(status_code=401, detail="Not authenticated", headers={"WWW-Authenticate": "Bearer"})
+    return verifier.verify(credentials.credentials)
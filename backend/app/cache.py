@@ -0,0 +1,177 @@
+# app/cache.py
+"""
+Read-through cache for rarely changing data (buildings, floors, layouts).
+
+Routers read with `await cache.get_or_load(key, loader)` and the write
+endpoints of the same module drop exactly the keys they affect with
+`await cache.invalidate(...)` / `await cache.invalidate_prefix(...)`.
+
+Two backends share the same small async interface (get / set / delete /
+delete_prefix / size):
+  - MemoryCache: in-process, TTL + size-bounded LRU (default)
+  - RedisCache: any redis.asyncio-compatible client (get / set(ex=) / delete /
+    scan_iter), so Redis round trips never block the event loop
+
+Key layout:
+  buildings:all?{page params}                 fetch-buildings
+  buildings:{id}                              fetch-building
+  floors:all?{page params}                    fetch-floors
+  floors:{id}                                 fetch-floor
+  floors:building:{building_id}               fetch-floors/{building_id}
+  floors:building:{building_id}:number:{n}    fetch-floor-by-building
+  objects:floor:{floor_id}                    fetch-placed-objects, fetch-objects/{floor_id}
+  heatmap:floor:{floor_id}:{index version}:.. fetch-floor-heatmap (stale once the floor index changes)
+"""
+import asyncio
+import json
+import time
+from collections import OrderedDict
+from app.config import CACHE_BACKEND, CACHE_TTL, CACHE_MAX_ENTRIES, REDIS_URL
+
+class MemoryCache:
+    def __init__(self, max_entries: int = 1024):
+        self.max_entries = max_entries
+        self.evictions = 0
+        self._entries = OrderedDict()  # key -> (expires_at, value), least recently used first
+
+    async def get(self, key: str):
+        entry = self._entries.get(key)
+        if entry is None:
+            return None
+        expires_at, value = entry
+        if expires_at <= time.monotonic():
+            del self._entries[key]
+            return None
+        self._entries.move_to_end(key)
+        return value
+
+    async def set(self, key: str, value, ttl: float):
+        self._entries[key] = (time.monotonic() + ttl, value)
+        self._entries.move_to_end(key)
+        while len(self._entries) > self.max_entries:
+            self._entries.popitem(last=False)
+            self.evictions += 1
+
+    async def delete(self, *keys: str):
+        for key in keys:
+            self._entries.pop(key, None)
+
+    async def delete_prefix(self, prefix: str):
+        for key in [k for k in self._entries if k.startswith(prefix)]:
+            del self._entries[key]
+
+    async def size(self) -> int:
+        return len(self._entries)
+
+class RedisCache:
+    """Stores JSON-encoded values in Redis; TTL and eviction are left to Redis (maxmemory-policy allkeys-lru)."""
+
+    def __init__(self, client, namespace: str = "hackmetu:"):
+        self.client = client
+        self.namespace = namespace
+        self.evictions = 0
+
+    SCAN_BATCH = 500  # Keys per SCAN / DEL round trip
+
+    async def get(self, key: str):
+        raw = await self.client.get(self.namespace + key)
+        return json.loads(raw) if raw is not None else None
+
+    async def set(self, key: str, value, ttl: float):
+        await self.client.set(self.namespace + key, json.dumps(value), ex=max(1, int(ttl)))
+
+    async def delete(self, *keys: str):
+        if keys:
+            await self.client.delete(*(self.namespace + key for key in keys))
+
+    async def delete_prefix(self, prefix: str):
+        batch = []
+        async for key in self.client.scan_iter(match=self.namespace + prefix + "*", count=self.SCAN_BATCH):
+            batch.append(key)
+            if len(batch) >= self.SCAN_BATCH:
+                await self.client.delete(*batch)
+                batch = []
+        if batch:
+            await self.client.delete(*batch)
+
+    async def size(self) -> int:
+        """Keys in this cache's namespace (not the whole Redis database)."""
+        count = 0
+        async for _ in self.client.scan_iter(match=self.namespace + "*", count=self.SCAN_BATCH):
+            count += 1
+        return count
+
+class Cache:
+    def __init__(self, backend, ttl: float):
+        self.backend = backend
+        self.ttl = ttl
+        self.hits = 0
+        self.misses = 0
+        self.invalidations = 0
+        self._loading = {}  # key -> future of the load in progress
+        self._generation = 0  # Bumped by every invalidation
+
+    async def get_or_load(self, key: str, loader, ttl: float = None):
+        """Return the cached value for key, or await loader(), cache and return it.
+        Concurrent misses on the same key share a single load."""
+        value = await self.backend.get(key)
+        if value is not None:
+            self.hits += 1
+            return value
+        self.misses += 1
+
+        pending = self._loading.get(key)
+        if pending is not None:
+            return await asyncio.shield(pending)
+
+        future = asyncio.get_running_loop().create_future()
+        self._loading[key] = future
+        generation = self._generation
+        try:
+            value = await loader()
+            # Don't cache a value loaded before an invalidation that happened meanwhile
+            if value is not None and generation == self._generation:
+                await self.backend.set(key, value, ttl or self.ttl)
+            future.set_result(value)
+            return value
+        except BaseException as e:
+            future.set_exception(e)
+            future.exception()  # Mark as retrieved when nobody else was waiting
+            raise
+        finally:
+            if self._loading.get(key) is future:
+                del self._loading[key]
+
+    async def invalidate(self, *keys: str):
+        self.invalidations += len(keys)
+        self._generation += 1
+        for key in keys:
+            self._loading.pop(key, None)
+        await self.backend.delete(*keys)
+
+    async def invalidate_prefix(self, prefix: str):
+        self.invalidations += 1
+        self._generation += 1
+        for key in [k for k in self._loading if k.startswith(prefix)]:
+            self._loading.pop(key, None)
+        await self.backend.delete_prefix(prefix)
+
+    async def stats(self) -> dict:
+        lookups = self.hits + self.misses
+        return {
+            "backend": type(self.backend).__name__,
+            "hits": self.hits,
+            "misses": self.misses,
+            "hit_ratio": round(self.hits / lookups, 4) if lookups else 0.0,
+            "invalidations": self.invalidations,
+            "evictions": self.backend.evictions,
+            "entries": await self.backend.size(),
+        }
+
+def create_backend():
+    if CACHE_BACKEND == "redis":
+        import redis.asyncio  # Optional dependency, only needed for CACHE_BACKEND=redis
+        return RedisCache(redis.asyncio.Redis.from_url(REDIS_URL))
+    return MemoryCache(CACHE_MAX_ENTRIES)
+
+cache = Cache(create_backend(), CACHE_TTL)
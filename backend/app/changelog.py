@@ -0,0 +1,104 @@
+# app/changelog.py
+"""
+Per-floor layout versions and a bounded change log, for delta sync.
+
+Every change published by the spatial hooks bumps the floor's version and is
+recorded under its entity (object or personnel id), keeping only the latest
+change per entity. A client that saw version V gets exactly the entities that
+changed after V. When older entries were compacted away, the floor was
+resized/deleted, or the client's versions come from another process (the
+epoch differs), it must fall back to a full snapshot.
+
+Versions are per worker: like the spatial index, the log only sees writes
+handled by this process. Whenever the floor's index is (re)loaded from the
+database, which is how writes made through other workers are picked up, the
+floor's log is reset so clients take a snapshot instead of an incomplete delta.
+"""
+import time
+from collections import OrderedDict
+from app.config import FLOOR_CHANGELOG_SIZE
+from app import spatial
+
+EPOCH = format(time.time_ns(), "x")  # Identifies this process's version sequence
+
+class FloorLog:
+    def __init__(self):
+        self.version = 0
+        self.min_version = 0          # Deltas are only complete for since >= min_version
+        self.entries = OrderedDict()  # (kind, id) -> (version, change), oldest first
+
+    def record(self, key, change: dict, max_entries: int):
+        self.version += 1
+        self.entries.pop(key, None)
+        self.entries[key] = (self.version, change)
+        while len(self.entries) > max_entries:
+            _, (evicted_version, _) = self.entries.popitem(last=False)
+            self.min_version = evicted_version
+
+    def reset(self):
+        """Forget everything: clients at any earlier version must take a snapshot."""
+        self.version += 1
+        self.min_version = self.version
+        self.entries.clear()
+
+    def changes_since(self, since: int):
+        """Changes after `since`, oldest first, or None when they are no longer all known."""
+        if since < self.min_version or since > self.version:
+            return None
+        changes = []
+        for version, change in reversed(self.entries.values()):
+            if version <= since:
+                break
+            changes.append(change)
+        changes.reverse()
+        return changes
+
+class ChangeLog:
+    def __init__(self, max_entries: int):
+        self.max_entries = max_entries
+        self.floors = {}  # floor_id -> FloorLog
+
+    def floor(self, floor_id: int) -> FloorLog:
+        log = self.floors.get(floor_id)
+        if log is None:
+            log = self.floors[floor_id] = FloorLog()
+        return log
+
+    def record(self, floor_id: int, change: dict):
+        """Listener for spatial.change_listeners."""
+        if floor_id is None:
+            return
+        log = self.floor(floor_id)
+        kind = change["type"]
+        if kind in ("floor.changed", "floor.reloaded"):
+            log.reset()
+        elif kind.startswith("object."):
+            object_id = change["object"]["id"] if kind == "object.saved" else change["id"]
+            log.record(("object", object_id), change, self.max_entries)
+        elif kind.startswith("personnel."):
+            log.record(("personnel", change["id"]), change, self.max_entries)
+
+    def delta(self, floor_id: int, since: int):
+        """
+        Return {"objects", "deletedObjects", "personnel", "removedPersonnel"} for the
+        changes after `since`, or None when the caller needs a full snapshot.
+        """
+        changes = self.floor(floor_id).changes_since(since)
+        if changes is None:
+            return None
+        delta = {"objects": [], "deletedObjects": [], "personnel": [], "removedPersonnel": []}
+        for change in changes:
+            kind = change["type"]
+            if kind == "object.saved":
+                delta["objects"].append(change["object"])
+            elif kind == "object.deleted":
+                delta["deletedObjects"].append(change["id"])
+            elif kind == "personnel.moved":
+                delta["personnel"].append({"id": change["id"], "floor_id": floor_id,
+                                           "x_coor": change["x_coor"], "y_coor": change["y_coor"]})
+            elif kind == "personnel.removed":
+                delta["removedPersonnel"].append(change["id"])
+        return delta
+
+changelog = ChangeLog(FLOOR_CHANGELOG_SIZE)
+spatial.change_listeners.append(changelog.record)
@@ -0,0 +1,97 @@
+# app/conditional.py
+"""
+Conditional GETs: ETag validators, 304 Not Modified and Cache-Control.
+
+  - ETagMiddleware hashes the body of every 200 JSON response to a GET and
+    answers 304 with an empty body when it matches If-None-Match. This saves
+    the transfer, not the work.
+  - Endpoints that know a version for their data (e.g. the floor occupancy
+    index) build the ETag up front with version_etag() and return
+    not_modified() before touching the cache or Supabase; it copies the
+    Cache-Control set by the dependency onto the 304. Responses that
+    already carry an ETag are left alone by the middleware.
+  - cache_control(policy) is a router dependency setting Cache-Control on
+    GET responses; the policies live in config.CACHE_CONTROL.
+"""
+import hashlib
+from typing import Optional
+from fastapi import Request, Response
+from starlette.datastructures import Headers, MutableHeaders
+
+def _strip_weak(tag: str) -> str:
+    return tag[2:] if tag.startswith("W/") else tag
+
+def etag_matches(if_none_match: Optional[str], etag: str) -> bool:
+    """Weak comparison of an ETag against an If-None-Match header."""
+    if not if_none_match:
+        return False
+    if if_none_match.strip() == "*":
+        return True
+    tag = _strip_weak(etag)
+    return any(_strip_weak(candidate.strip()) == tag for candidate in if_none_match.split(","))
+
+def version_etag(*parts) -> str:
+    return 'W/"' + "-".join(str(part) for part in parts) + '"'
+
+def not_modified(request: Request, etag: str, response: Response) -> Optional[Response]:
+    """
+    A 304 response when the client already has `etag`, else None. It carries
+    the headers set so far on the endpoint's injected `response` (Cache-Control
+    from the router dependency), as a 304 repeats the caching headers of the 200.
+    """
+    if etag_matches(request.headers.get("if-none-match"), etag):
+        headers = {k: v for k, v in response.headers.items() if k != "content-length"}
+        headers["ETag"] = etag
+        return Response(status_code=304, headers=headers)
+    return None
+
+def cache_control(policy: str):
+    """Router dependency that sets Cache-Control on GET responses, unless the endpoint set its own."""
+    def set_cache_control(request: Request, response: Response):
+        if policy and request.method == "GET":
+            response.headers.setdefault("Cache-Control", policy)
+    return set_cache_control
+
+class ETagMiddleware:
+    """Content-hash ETags for buffered JSON responses to GET requests."""
+
+    def __init__(self, app):
+        self.app = app
+
+    async def __call__(self, scope, receive, send):
+        if scope["type"] != "http" or scope["method"] != "GET":
+            await self.app(scope, receive, send)
+            return
+
+        if_none_match = Headers(scope=scope).get("if-none-match")
+        start = None
+        chunks = []
+
+        async def send_with_etag(message):
+            nonlocal start
+            if message["type"] == "http.response.start":
+                headers = Headers(raw=message["headers"])
+                # Streams (exports, live events), errors and endpoints with their own ETag pass through
+                if (message["status"] == 200 and "etag" not in headers
+                        and headers.get("content-type", "").startswith("application/json")):
+                    start = message
+                    return
+            elif start is not None:
+                chunks.append(message.get("body", b""))
+                if message.get("more_body", False):
+                    return
+                body = b"".join(chunks)
+                # Weak: the bytes on the wire may be compressed differently
+                etag = 'W/"' + hashlib.blake2b(body, digest_size=16).hexdigest() + '"'
+                headers = MutableHeaders(raw=start["headers"])
+                headers["ETag"] = etag
+                if etag_matches(if_none_match, etag):
+                    start["status"] = 304
+                    del headers["content-length"]
+                    body = b""
+                await send(start)
+                await send({"type": "http.response.body", "body": body})
+                return
+            await send(message)
+
+        await self.app(scope, receive, send_with_etag)
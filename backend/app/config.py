@@ -1,6 +1,96 @@
 import os
 
+# Where data is stored: "supabase" (hosted), or "sqlite" / "memory" for local, offline
+# and test deployments (see app/storage.py). STORAGE_PATH is the SQLite database file.
+STORAGE_BACKEND = os.getenv("STORAGE_BACKEND", "supabase")
+STORAGE_PATH = os.getenv("STORAGE_PATH", "hackmetu.sqlite3")
+
 SUPABASE_URL = os.getenv("SUPABASE_URL")
 SUPABASE_KEY = os.getenv("SUPABASE_KEY")
 SUPABASE_JWT_SECRET = os.getenv("SUPABASE_JWT_SECRET")
-ALLOWED_ORIGINS = os.getenv("ALLOWED_ORIGINS", "*").split(",")
\ No newline at end of file
+ALLOWED_ORIGINS = os.getenv("ALLOWED_ORIGINS", "*").split(",")
+
+# Max number of Supabase queries in flight per worker (size of the DB thread pool
+# and of the keep-alive HTTP connection pool)
+SUPABASE_MAX_WORKERS = int(os.getenv("SUPABASE_MAX_WORKERS", "32"))
+# Per-request timeout and idle keep-alive lifetime of Supabase connections, in seconds
+SUPABASE_TIMEOUT = float(os.getenv("SUPABASE_TIMEOUT", "10"))
+SUPABASE_KEEPALIVE_EXPIRY = float(os.getenv("SUPABASE_KEEPALIVE_EXPIRY", "30"))
+# Retries of idempotent reads after a connection error or timeout, with exponential backoff
+SUPABASE_READ_RETRIES = int(os.getenv("SUPABASE_READ_RETRIES", "2"))
+SUPABASE_RETRY_BACKOFF = float(os.getenv("SUPABASE_RETRY_BACKOFF", "0.1"))
+
+# Create a building and its floors atomically through the create_building_with_floors
+# Postgres function (backend/sql/001_create_building_with_floors.sql) instead of two inserts
+CREATE_BUILDING_RPC = os.getenv("CREATE_BUILDING_RPC", "false").lower() == "true"
+
+# Write seat assignments with one UPDATE through the assign_seats Postgres function
+# (backend/sql/004_assign_seats.sql). Set to false where the function isn't installed:
+# the batch is then written with one upsert of the seat columns. The local storage
+# engines have no Postgres functions and always use the upsert.
+ASSIGN_SEATS_RPC = os.getenv("ASSIGN_SEATS_RPC", "true").lower() == "true" and STORAGE_BACKEND == "supabase"
+
+# Seconds an in-memory floor occupancy index is trusted before it is reloaded
+SPATIAL_INDEX_TTL = float(os.getenv("SPATIAL_INDEX_TTL", "30"))
+
+# Read-through cache for buildings, floors and layouts: "memory" or "redis"
+CACHE_BACKEND = os.getenv("CACHE_BACKEND", "memory")
+CACHE_TTL = float(os.getenv("CACHE_TTL", "60"))
+CACHE_MAX_ENTRIES = int(os.getenv("CACHE_MAX_ENTRIES", "1024"))
+REDIS_URL = os.getenv("REDIS_URL", "redis://localhost:6379/0")
+
+# Page size of the list endpoints (?limit=); requests above the maximum are clamped
+DEFAULT_PAGE_SIZE = int(os.getenv("DEFAULT_PAGE_SIZE", "1000"))
+MAX_PAGE_SIZE = int(os.getenv("MAX_PAGE_SIZE", "1000"))
+
+# Live floor change feed (/floor-events/{floor_id}): events buffered per subscriber
+# before it is told to resync, subscribers per worker, and seconds between heartbeats
+FLOOR_EVENTS_QUEUE_SIZE = int(os.getenv("FLOOR_EVENTS_QUEUE_SIZE", "256"))
+FLOOR_EVENTS_MAX_SUBSCRIBERS = int(os.getenv("FLOOR_EVENTS_MAX_SUBSCRIBERS", "1000"))
+FLOOR_EVENTS_HEARTBEAT = float(os.getenv("FLOOR_EVENTS_HEARTBEAT", "15"))
+
+# Changes kept per floor for delta sync (/floors/{id}/changes); older clients get a snapshot
+FLOOR_CHANGELOG_SIZE = int(os.getenv("FLOOR_CHANGELOG_SIZE", "5000"))
+
+# Cache-Control of GET responses per router, overridable with CACHE_CONTROL_<ROUTER>
+# (e.g. CACHE_CONTROL_BUILDINGS="max-age=30"). "no-cache" lets clients keep a copy
+# but revalidate it with its ETag every time.
+CACHE_CONTROL = {
+    router: os.getenv(f"CACHE_CONTROL_{router.upper()}", default)
+    for router, default in {
+        "admins": "private, no-cache",
+        "personnels": "private, no-cache",
+        "objects": "no-cache",
+        "buildings": "no-cache",
+        "floors": "no-cache",
+        "feedbacks": "private, no-cache",
+        "exports": "no-store",
+    }.items()
+}
+
+# Responses above GZIP_MIN_SIZE bytes are gzip-compressed for clients that accept it.
+# Level 1-9; higher levels save little on JSON but cost much more CPU.
+GZIP_MIN_SIZE = int(os.getenv("GZIP_MIN_SIZE", "1024"))
+GZIP_LEVEL = int(os.getenv("GZIP_LEVEL", "5"))
+
+# Add a Server-Timing header (database time and round trips vs. total) to every response
+SERVER_TIMING = os.getenv("SERVER_TIMING", "false").lower() == "true"
+
+# Personnel sessions: lifetime of issued tokens in seconds, verified tokens remembered
+# per worker, and PBKDF2-SHA256 iterations for stored passwords
+TOKEN_TTL = int(os.getenv("TOKEN_TTL", "28800"))
+TOKEN_CACHE_SIZE = int(os.getenv("TOKEN_CACHE_SIZE", "4096"))
+PASSWORD_HASH_ITERATIONS = int(os.getenv("PASSWORD_HASH_ITERATIONS", "600000"))
+
+# Seconds between recounts of the per-floor occupancy/object aggregates from the
+# database (corrects drift and picks up other workers' writes); 0 disables the job
+AGGREGATES_RECONCILE_INTERVAL = float(os.getenv("AGGREGATES_RECONCILE_INTERVAL", "300"))
+
+# Seconds the in-process feedback search index is trusted before it is reloaded
+FEEDBACK_INDEX_TTL = float(os.getenv("FEEDBACK_INDEX_TTL", "300"))
+
+# Background jobs (202 Accepted + GET /jobs/{id}): jobs run at once per worker,
+# jobs waiting before submissions are refused, and finished jobs kept for polling
+JOB_WORKERS = int(os.getenv("JOB_WORKERS", "4"))
+JOB_QUEUE_SIZE = int(os.getenv("JOB_QUEUE_SIZE", "100"))
+JOB_HISTORY = int(os.getenv("JOB_HISTORY", "1000"))
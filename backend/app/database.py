@@ -1,14 +1,156 @@
 # app/database.py
+import asyncio
+import logging
+import random
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+import httpx
 from supabase import create_client, Client
+from supabase.lib.client_options import ClientOptions
 from fastapi import HTTPException
-from app.config import SUPABASE_URL, SUPABASE_KEY
+from app.metrics import metrics
+from app.storage import create_local_client
+from app.config import (
+    STORAGE_BACKEND, STORAGE_PATH, SUPABASE_URL, SUPABASE_KEY, SUPABASE_MAX_WORKERS, SUPABASE_TIMEOUT,
+    SUPABASE_KEEPALIVE_EXPIRY, SUPABASE_READ_RETRIES, SUPABASE_RETRY_BACKOFF,
+)
 
 def get_supabase_client() -> Client:
     try:
-        return create_client(SUPABASE_URL, SUPABASE_KEY)
+        options = ClientOptions(postgrest_client_timeout=SUPABASE_TIMEOUT)
+        client = create_client(SUPABASE_URL, SUPABASE_KEY, options)
+        _use_pooled_session(client)
+        return client
     except Exception as e:
-        print(f"[ERROR] Supabase Initialization Failed: {str(e)}")
+        logging.error(f"Supabase Initialization Failed: {str(e)}")
         raise HTTPException(status_code=500, detail=f"Failed to initialize Supabase: {str(e)}")
 
-# Initialize the Supabase client
-supabase: Client = get_supabase_client()
\ No newline at end of file
+def _use_pooled_session(client: Client):
+    """
+    Replace the PostgREST HTTP session with one whose keep-alive pool matches the
+    thread pool: one connection per in-flight query, kept open between requests.
+    """
+    try:
+        session = client.postgrest.session
+        client.postgrest.session = httpx.Client(
+            base_url=session.base_url,
+            headers=session.headers,
+            timeout=httpx.Timeout(SUPABASE_TIMEOUT),
+            limits=httpx.Limits(
+                max_connections=SUPABASE_MAX_WORKERS,
+                max_keepalive_connections=SUPABASE_MAX_WORKERS,
+                keepalive_expiry=SUPABASE_KEEPALIVE_EXPIRY,
+            ),
+            follow_redirects=True,
+        )
+        session.close()
+    except AttributeError:
+        logging.warning("Supabase client has no PostgREST session to tune; using its default HTTP pool")
+
+class Database:
+    """
+    The shared database client (Supabase, or a local engine from app.storage
+    when STORAGE_BACKEND says so) and the bounded thread pool its blocking queries
+    run on. connect() / close() are called from the FastAPI lifespan; using the
+    database before connect() (scripts, benchmarks) connects lazily.
+    """
+
+    def __init__(self):
+        self.client = None
+        self.executor = None
+        self._lock = threading.Lock()
+        self._stats_lock = threading.Lock()
+        self.queued = 0      # Queries waiting for a free worker
+        self.in_flight = 0   # Queries currently running
+        self.completed = 0
+        self.failed = 0
+        self.retries = 0
+
+    def connect(self) -> Client:
+        with self._lock:
+            if self.client is None:
+                if STORAGE_BACKEND == "supabase":
+                    self.client = get_supabase_client()
+                else:
+                    self.client = create_local_client(STORAGE_BACKEND, STORAGE_PATH)
+                # Queries run on a bounded thread pool instead of the event loop. supabase-py
+                # has an AsyncClient, but the local engines in app.storage are synchronous and
+                # share the sync query builders, so one execute path serves every backend.
+                # The pool size caps concurrent round trips.
+                self.executor = ThreadPoolExecutor(max_workers=SUPABASE_MAX_WORKERS, thread_name_prefix="supabase")
+            return self.client
+
+    def close(self):
+        with self._lock:
+            if self.executor is not None:
+                self.executor.shutdown(wait=True)
+            session = getattr(getattr(self.client, "postgrest", None), "session", None)
+            if session is not None:
+                session.close()
+            if hasattr(self.client, "close"):
+                self.client.close()  # Local storage engines
+            self.client = None
+            self.executor = None
+
+    def _run(self, query):
+        with self._stats_lock:
+            self.queued -= 1
+            self.in_flight += 1
+        try:
+            return query.execute()
+        finally:
+            with self._stats_lock:
+                self.in_flight -= 1
+
+    async def execute(self, query):
+        self.connect()
+        loop = asyncio.get_running_loop()
+        # Reads can safely be sent again; writes and RPCs are never retried
+        attempts = 1 + (SUPABASE_READ_RETRIES if getattr(query, "http_method", None) in ("GET", "HEAD") else 0)
+        for attempt in range(attempts):
+            with self._stats_lock:
+                self.queued += 1
+            start = time.perf_counter()
+            try:
+                response = await loop.run_in_executor(self.executor, self._run, query)
+                self.completed += 1
+                metrics.observe_query(query, time.perf_counter() - start)
+                return response
+            except httpx.TransportError:
+                metrics.observe_query(query, time.perf_counter() - start, failed=True)
+                if attempt + 1 == attempts:
+                    self.failed += 1
+                    raise
+                self.retries += 1
+                delay = SUPABASE_RETRY_BACKOFF * (2 ** attempt)
+                await asyncio.sleep(delay + random.uniform(0, delay))
+            except Exception:
+                metrics.observe_query(query, time.perf_counter() - start, failed=True)
+                self.failed += 1
+                raise
+
+    def stats(self) -> dict:
+        return {
+            "pool_size": SUPABASE_MAX_WORKERS,
+            "in_flight": self.in_flight,
+            "queued": self.queued,
+            "saturation": round(self.in_flight / SUPABASE_MAX_WORKERS, 4),
+            "completed": self.completed,
+            "failed": self.failed,
+            "retries": self.retries,
+        }
+
+database = Database()
+
+def table(name: str):
+    """Start a query builder on the given table. Building a query does no I/O."""
+    return database.connect().table(name)
+
+def rpc(name: str, params: dict):
+    """Build a call to a Postgres function exposed through PostgREST."""
+    return database.connect().rpc(name, params)
+
+async def execute(query):
+    """Run a built query (table, rpc, ...) off the event loop and return its response."""
+    return await database.execute(query)
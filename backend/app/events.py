@@ -0,0 +1,105 @@
+# app/events.py
+"""
+Live per-floor change feed, so editors don't have to poll the layout endpoints.
+
+Every write that goes through the spatial hooks (objects, personnel, floors)
+is published to the subscribers of the affected floor as a small delta:
+
+  {"type": "object.saved",      "floor_id": 3, "object": {...row}}
+  {"type": "object.deleted",    "floor_id": 3, "id": 17}
+  {"type": "personnel.moved",   "floor_id": 3, "id": 5, "x_coor": 4, "y_coor": 2}
+  {"type": "personnel.removed", "floor_id": 3, "id": 5}
+  {"type": "floor.changed",     "floor_id": 3}
+  {"type": "floor.reloaded",    "floor_id": 3}
+  {"type": "resync",            "floor_id": 3}
+
+Each subscriber has a bounded queue, so a slow client never makes a write
+wait or grows memory without limit. When its queue is full the backlog is
+dropped and replaced by a single "resync" event, after which the client
+re-fetches the floor and keeps applying deltas from there. "floor.reloaded"
+means the same: the floor was re-read from the database and may include
+writes made through other workers that were never published here.
+
+Events only reach subscribers connected to the worker that handled the write.
+"""
+import asyncio
+import json
+from fastapi import HTTPException
+from app.config import FLOOR_EVENTS_QUEUE_SIZE, FLOOR_EVENTS_MAX_SUBSCRIBERS, FLOOR_EVENTS_HEARTBEAT
+from app import spatial
+
+class Subscription:
+    def __init__(self, floor_id: int, queue_size: int):
+        self.floor_id = floor_id
+        self.queue = asyncio.Queue(maxsize=queue_size)
+        self.resyncs = 0
+
+    def offer(self, event: dict):
+        try:
+            self.queue.put_nowait(event)
+        except asyncio.QueueFull:
+            # The client is too far behind: drop its backlog and tell it to re-fetch
+            while not self.queue.empty():
+                self.queue.get_nowait()
+            self.queue.put_nowait({"type": "resync", "floor_id": self.floor_id})
+            self.resyncs += 1
+
+class FloorBroker:
+    def __init__(self, queue_size: int, max_subscribers: int):
+        self.queue_size = queue_size
+        self.max_subscribers = max_subscribers
+        self.subscribers = {}  # floor_id -> set of Subscription
+        self.published = 0
+        self.resyncs = 0
+
+    def subscriber_count(self) -> int:
+        return sum(len(subs) for subs in self.subscribers.values())
+
+    def subscribe(self, floor_id: int) -> Subscription:
+        if self.subscriber_count() >= self.max_subscribers:
+            raise HTTPException(status_code=503, detail="Too many live subscribers, try again later")
+        subscription = Subscription(floor_id, self.queue_size)
+        self.subscribers.setdefault(floor_id, set()).add(subscription)
+        return subscription
+
+    def unsubscribe(self, subscription: Subscription):
+        self.resyncs += subscription.resyncs
+        subs = self.subscribers.get(subscription.floor_id)
+        if subs is not None:
+            subs.discard(subscription)
+            if not subs:
+                del self.subscribers[subscription.floor_id]
+
+    def publish(self, floor_id: int, change: dict):
+        subs = self.subscribers.get(floor_id)
+        if not subs:
+            return
+        event = {**change, "floor_id": floor_id}
+        for subscription in subs:
+            subscription.offer(event)
+        self.published += 1
+
+    def stats(self) -> dict:
+        return {
+            "floors": len(self.subscribers),
+            "subscribers": self.subscriber_count(),
+            "published": self.published,
+            "resyncs": self.resyncs + sum(s.resyncs for subs in self.subscribers.values() for s in subs),
+        }
+
+broker = FloorBroker(FLOOR_EVENTS_QUEUE_SIZE, FLOOR_EVENTS_MAX_SUBSCRIBERS)
+spatial.change_listeners.append(broker.publish)
+
+async def sse_stream(request, subscription: Subscription):
+    """Server-Sent Events for one subscription, with heartbeat comments so proxies keep the connection open."""
+    try:
+        yield f"event: subscribed\ndata: {json.dumps({'floor_id': subscription.floor_id})}\n\n"
+        while not await request.is_disconnected():
+            try:
+                event = await asyncio.wait_for(subscription.queue.get(), FLOOR_EVENTS_HEARTBEAT)
+            except asyncio.TimeoutError:
+                yield ": heartbeat\n\n"
+                continue
+            yield f"event: {event['type']}\ndata: {json.dumps(event, default=str)}\n\n"
+    finally:
+        broker.unsubscribe(subscription)
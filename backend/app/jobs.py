@@ -0,0 +1,145 @@
+# app/jobs.py
+"""
+In-process job queue for operations too slow to run inside a request.
+
+An endpoint submits a coroutine function and answers 202 Accepted with the job
+id right away; JOB_WORKERS workers run the queued jobs, so at most that many
+heavy operations hit the database at once whatever the number of requests.
+Clients poll GET /jobs/{id} for the status, progress and result:
+
+  {"id": "...", "kind": "create-floor", "status": "running",
+   "progress": {"done": 1, "total": 2}, "result": null, "error": null, ...}
+
+status goes queued -> running -> succeeded | failed. The queue holds at most
+JOB_QUEUE_SIZE jobs (submitting more is a 503) and the last JOB_HISTORY
+finished jobs are kept for polling.
+
+Jobs live in the worker process that accepted them: they are lost on restart
+and only visible through that worker.
+"""
+import asyncio
+import logging
+import time
+import uuid
+from collections import OrderedDict
+from typing import Optional
+from fastapi import HTTPException
+from fastapi.responses import JSONResponse
+from app.config import JOB_WORKERS, JOB_QUEUE_SIZE, JOB_HISTORY
+
+class Job:
+    def __init__(self, kind: str, fn, args: tuple):
+        self.id = uuid.uuid4().hex
+        self.kind = kind
+        self.fn = fn
+        self.args = args
+        self.status = "queued"
+        self.done = 0
+        self.total = None
+        self.result = None
+        self.error = None
+        self.created_at = time.time()
+        self.started_at = None
+        self.finished_at = None
+
+    def report(self, done: int, total: Optional[int] = None):
+        """Progress callback for the job's function: `done` of `total` steps."""
+        self.done = done
+        if total is not None:
+            self.total = total
+
+    def as_dict(self) -> dict:
+        return {
+            "id": self.id,
+            "kind": self.kind,
+            "status": self.status,
+            "progress": {"done": self.done, "total": self.total},
+            "result": self.result,
+            "error": self.error,
+            "createdAt": self.created_at,
+            "startedAt": self.started_at,
+            "finishedAt": self.finished_at,
+        }
+
+class JobQueue:
+    def __init__(self, workers: int, queue_size: int, history: int):
+        self.worker_count = workers
+        self.queue_size = queue_size
+        self.history = history
+        self.jobs = OrderedDict()  # id -> Job, oldest first
+        self.succeeded = 0
+        self.failed = 0
+        self._queue = None
+        self._workers = []
+        self._loop = None
+
+    def _start(self):
+        # Started on first use, inside the running event loop
+        loop = asyncio.get_running_loop()
+        if self._workers and self._loop is loop:
+            return
+        self._loop = loop
+        self._queue = asyncio.Queue(maxsize=self.queue_size)
+        self._workers = [asyncio.create_task(self._work()) for _ in range(self.worker_count)]
+
+    def submit(self, kind: str, fn, *args) -> Job:
+        """Queue fn(*args, job=job); raises 503 when the queue is full."""
+        self._start()
+        job = Job(kind, fn, args)
+        try:
+            self._queue.put_nowait(job)
+        except asyncio.QueueFull:
+            raise HTTPException(status_code=503, detail="Too many queued jobs, try again later")
+        self.jobs[job.id] = job
+        self._trim()
+        return job
+
+    def get(self, job_id: str) -> Optional[Job]:
+        return self.jobs.get(job_id)
+
+    async def _work(self):
+        while True:
+            job = await self._queue.get()
+            job.status = "running"
+            job.started_at = time.time()
+            try:
+                job.result = await job.fn(*job.args, job=job)
+                job.status = "succeeded"
+                self.succeeded += 1
+            except Exception as e:
+                job.status = "failed"
+                job.error = e.detail if isinstance(e, HTTPException) else str(e)
+                self.failed += 1
+                logging.error(f"Job {job.kind} {job.id} failed: {job.error}")
+            finally:
+                job.finished_at = time.time()
+                job.fn = job.args = None
+                self._queue.task_done()
+
+    def _trim(self):
+        # Forget the oldest finished jobs beyond the history size
+        finished = sum(1 for job in self.jobs.values() if job.finished_at is not None)
+        for job_id in list(self.jobs):
+            if finished <= self.history:
+                break
+            if self.jobs[job_id].finished_at is not None:
+                del self.jobs[job_id]
+                finished -= 1
+
+    async def close(self):
+        for worker in self._workers:
+            worker.cancel()
+        self._workers = []
+
+    def stats(self) -> dict:
+        statuses = {"queued": 0, "running": 0, "succeeded": 0, "failed": 0}
+        for job in self.jobs.values():
+            statuses[job.status] += 1
+        return {"workers": len(self._workers), **statuses,
+                "totalSucceeded": self.succeeded, "totalFailed": self.failed}
+
+def accepted(job: Job) -> JSONResponse:
+    """202 response pointing at the job's status URL."""
+    return JSONResponse(status_code=202, content=job.as_dict(), headers={"Location": f"/jobs/{job.id}"})
+
+jobs = JobQueue(JOB_WORKERS, JOB_QUEUE_SIZE, JOB_HISTORY)
@@ -0,0 +1,36 @@
+# app/layout.py
+"""
+Helpers for the footprint of floor objects.
+
+Objects are stored as one row per piece of furniture: (x_coor, y_coor) is the
+top-left cell and the object covers `width` cells along x and `length` cells
+along y. Rows written before the width/length columns existed default to 1x1.
+"""
+from app.cache import cache
+from app.pagination import iter_rows
+
+async def fetch_floor_objects(floor_id: int) -> list:
+    """Objects of a floor, one row per object, read through the cache (objects:floor:{id})."""
+    async def load():
+        # Paged, so floors with more objects than PostgREST's row cap are loaded in full
+        return [row async for row in iter_rows("Objects", None, lambda query: query.eq("floor_id", floor_id))]
+
+    return await cache.get_or_load(f"objects:floor:{floor_id}", load)
+
+def object_cells(obj: dict):
+    """Yield every (x, y) cell covered by an object row."""
+    x0, y0 = obj["x_coor"], obj["y_coor"]
+    for dx in range(obj.get("width") or 1):
+        for dy in range(obj.get("length") or 1):
+            yield x0 + dx, y0 + dy
+
+def expand_cells(objects: list) -> list:
+    """
+    Legacy view: one 1x1 row per covered cell, as the API returned before
+    objects were stored as rectangles. Cells keep the id of their object.
+    """
+    return [
+        {**obj, "x_coor": x, "y_coor": y, "width": 1, "length": 1}
+        for obj in objects
+        for x, y in object_cells(obj)
+    ]
@@ -1,16 +1,41 @@
+import asyncio
+from contextlib import asynccontextmanager
 from fastapi.middleware.cors import CORSMiddleware
-from fastapi import FastAPI
-from app.config import ALLOWED_ORIGINS
-from app.database import supabase
-from .routers import admins, personnels, objects, buildings, floors, feedbacks
+from fastapi import Depends, FastAPI, HTTPException
+from fastapi.responses import PlainTextResponse
+from app.config import (ALLOWED_ORIGINS, CACHE_CONTROL, GZIP_MIN_SIZE, GZIP_LEVEL, SERVER_TIMING,
+                        AGGREGATES_RECONCILE_INTERVAL)
+from app.conditional import ETagMiddleware, cache_control
+from app.responses import CompressionMiddleware
+from app.metrics import MetricsMiddleware, metrics
+from app.database import database
+from app.cache import cache
+from app.events import broker
+from app.aggregates import aggregates
+from app.jobs import jobs
+from .routers import admins, personnels, objects, buildings, floors, feedbacks, exports
 
-app = FastAPI()
-app.include_router(admins.router)
-app.include_router(personnels.router)
-app.include_router(objects.router)
-app.include_router(buildings.router)
-app.include_router(floors.router)
-app.include_router(feedbacks.router)
+@asynccontextmanager
+async def lifespan(app: FastAPI):
+    # Open the shared Supabase client and its pools on startup, not at import
+    database.connect()
+    reconciliation = None
+    if AGGREGATES_RECONCILE_INTERVAL > 0:
+        reconciliation = asyncio.create_task(aggregates.run_reconciliation(AGGREGATES_RECONCILE_INTERVAL))
+    yield
+    if reconciliation is not None:
+        reconciliation.cancel()
+    await jobs.close()
+    database.close()
+
+app = FastAPI(lifespan=lifespan)
+app.include_router(admins.router, dependencies=[Depends(cache_control(CACHE_CONTROL["admins"]))])
+app.include_router(personnels.router, dependencies=[Depends(cache_control(CACHE_CONTROL["personnels"]))])
+app.include_router(objects.router, dependencies=[Depends(cache_control(CACHE_CONTROL["objects"]))])
+app.include_router(buildings.router, dependencies=[Depends(cache_control(CACHE_CONTROL["buildings"]))])
+app.include_router(floors.router, dependencies=[Depends(cache_control(CACHE_CONTROL["floors"]))])
+app.include_router(feedbacks.router, dependencies=[Depends(cache_control(CACHE_CONTROL["feedbacks"]))])
+app.include_router(exports.router, dependencies=[Depends(cache_control(CACHE_CONTROL["exports"]))])
 
 
 app.add_middleware(
@@ -19,5 +44,70 @@ app.add_middleware(
     allow_credentials=True,
     allow_methods=["*"],
     allow_headers=["*"],
+    expose_headers=["X-Next-Cursor", "ETag", "Location"],
 )
+app.add_middleware(ETagMiddleware)
+# Middleware added later wraps the earlier ones: compression sits outside the ETags,
+# so they hash the uncompressed body, and metrics see the final status of every response
+app.add_middleware(CompressionMiddleware, minimum_size=GZIP_MIN_SIZE, compresslevel=GZIP_LEVEL)
+app.add_middleware(MetricsMiddleware, server_timing=SERVER_TIMING)
+
+
+@app.get("/cache-stats")
+async def cache_stats():
+    return await cache.stats()
+
+
+@app.get("/db-stats")
+async def db_stats():
+    return database.stats()
+
+
+
+@app.get("/events-stats")
+async def events_stats():
+    return broker.stats()
+
+
+
+@app.get("/aggregates-stats")
+async def aggregates_stats():
+    return aggregates.stats()
+
+
+@app.post("/reconcile-aggregates")
+async def reconcile_aggregates():
+    """Recount the tracked floors now instead of waiting for the background job."""
+    return await aggregates.reconcile()
+
+
+
+@app.get("/jobs/{job_id}")
+async def fetch_job(job_id: str):
+    """Status, progress and (once finished) result or error of a background job."""
+    job = jobs.get(job_id)
+    if job is None:
+        raise HTTPException(status_code=404, detail="Job not found")
+    return job.as_dict()
+
+
+@app.get("/jobs-stats")
+async def jobs_stats():
+    return jobs.stats()
+
+
 
+@app.get("/metrics", response_class=PlainTextResponse)
+async def metrics_endpoint():
+    """Prometheus scrape endpoint."""
+    db = database.stats()
+    job_stats = jobs.stats()
+    return metrics.render({
+        "db_pool_in_flight": db["in_flight"],
+        "db_pool_queued": db["queued"],
+        "db_pool_size": db["pool_size"],
+        "cache_entries": (await cache.stats())["entries"],
+        "live_subscribers": broker.subscriber_count(),
+        "jobs_queued": job_stats["queued"],
+        "jobs_running": job_stats["running"],
+    })
@@ -0,0 +1,162 @@
+# app/metrics.py
+"""
+Request and database instrumentation, exposed in the Prometheus text format.
+
+MetricsMiddleware records, per route template (e.g. /fetch-floor/{floor_id}):
+latency histograms, responses by status code and requests in flight. Every
+query run through app.database.execute is timed per table and operation, and
+counted against the request that made it. When SERVER_TIMING is on, responses
+carry a Server-Timing header with the database time, the number of round
+trips and the total time.
+
+Metrics are per worker; Prometheus sums them across workers when scraping each.
+"""
+import time
+from contextvars import ContextVar
+from typing import Optional
+from starlette.datastructures import MutableHeaders
+
+# Upper bounds of the histogram buckets: latencies in seconds, and round trips per request
+BUCKETS = (0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0)
+QUERY_COUNT_BUCKETS = (0, 1, 2, 3, 5, 10, 20, 50, 100)
+
+OPERATIONS = {"GET": "select", "HEAD": "count", "POST": "insert", "PATCH": "update", "DELETE": "delete"}
+
+class Histogram:
+    def __init__(self, buckets: tuple = BUCKETS):
+        self.buckets = buckets
+        self.counts = [0] * len(buckets)  # Non-cumulative, one per bucket; +Inf is `count`
+        self.count = 0
+        self.sum = 0.0
+
+    def observe(self, value: float):
+        self.count += 1
+        self.sum += value
+        for i, bound in enumerate(self.buckets):
+            if value <= bound:
+                self.counts[i] += 1
+                break
+
+class RequestStats:
+    """Database work done on behalf of one HTTP request."""
+
+    def __init__(self):
+        self.db_calls = 0
+        self.db_seconds = 0.0
+
+current_request: ContextVar[Optional[RequestStats]] = ContextVar("current_request", default=None)
+
+class Metrics:
+    def __init__(self):
+        self.in_flight = 0
+        self.requests = {}      # (method, route, status) -> count
+        self.latency = {}       # (method, route) -> Histogram
+        self.db_latency = {}    # (table, operation) -> Histogram
+        self.db_errors = {}     # (table, operation) -> count
+        self.db_per_request = Histogram(QUERY_COUNT_BUCKETS)
+
+    def observe_request(self, method: str, route: str, status: int, seconds: float, stats: RequestStats):
+        key = (method, route, status)
+        self.requests[key] = self.requests.get(key, 0) + 1
+        self.latency.setdefault((method, route), Histogram()).observe(seconds)
+        self.db_per_request.observe(stats.db_calls)
+
+    def observe_query(self, query, seconds: float, failed: bool = False):
+        label = query_label(query)
+        self.db_latency.setdefault(label, Histogram()).observe(seconds)
+        if failed:
+            self.db_errors[label] = self.db_errors.get(label, 0) + 1
+        stats = current_request.get()
+        if stats is not None:
+            stats.db_calls += 1
+            stats.db_seconds += seconds
+
+    def render(self, gauges: dict = None) -> str:
+        """All metrics in the Prometheus text exposition format."""
+        lines = [
+            "# TYPE http_requests_in_flight gauge",
+            f"http_requests_in_flight {self.in_flight}",
+            "# TYPE http_requests_total counter",
+        ]
+        for (method, route, status), count in sorted(self.requests.items()):
+            lines.append(f'http_requests_total{{method="{method}",route="{route}",status="{status}"}} {count}')
+
+        lines.append("# TYPE http_request_duration_seconds histogram")
+        for (method, route), hist in sorted(self.latency.items()):
+            lines += _histogram_lines("http_request_duration_seconds", f'method="{method}",route="{route}"', hist)
+
+        lines.append("# TYPE db_query_duration_seconds histogram")
+        for (table_name, operation), hist in sorted(self.db_latency.items()):
+            lines += _histogram_lines("db_query_duration_seconds", f'table="{table_name}",operation="{operation}"', hist)
+
+        lines.append("# TYPE db_query_errors_total counter")
+        for (table_name, operation), count in sorted(self.db_errors.items()):
+            lines.append(f'db_query_errors_total{{table="{table_name}",operation="{operation}"}} {count}')
+
+        lines.append("# TYPE db_queries_per_request histogram")
+        lines += _histogram_lines("db_queries_per_request", "", self.db_per_request)
+
+        for name, value in (gauges or {}).items():
+            lines += [f"# TYPE {name} gauge", f"{name} {value}"]
+        return "\n".join(lines) + "\n"
+
+def _histogram_lines(name: str, labels: str, hist: Histogram) -> list:
+    sep = "," if labels else ""
+    lines = []
+    cumulative = 0
+    for bound, count in zip(hist.buckets, hist.counts):
+        cumulative += count
+        lines.append(f'{name}_bucket{{{labels}{sep}le="{bound}"}} {cumulative}')
+    lines.append(f'{name}_bucket{{{labels}{sep}le="+Inf"}} {hist.count}')
+    lines.append(f"{name}_sum{{{labels}}} {round(hist.sum, 6)}")
+    lines.append(f"{name}_count{{{labels}}} {hist.count}")
+    return lines
+
+def query_label(query) -> tuple:
+    """(table, operation) of a PostgREST query builder, e.g. ("Objects", "select")."""
+    path = getattr(query, "path", "") or ""
+    if path.startswith("/rpc/"):
+        return path[len("/rpc/"):], "rpc"
+    operation = OPERATIONS.get(getattr(query, "http_method", None), "other")
+    if operation == "insert" and "resolution=" in str(getattr(query, "headers", {}).get("Prefer", "")):
+        operation = "upsert"
+    return path.lstrip("/") or "unknown", operation
+
+metrics = Metrics()
+
+class MetricsMiddleware:
+    def __init__(self, app, server_timing: bool = False):
+        self.app = app
+        self.server_timing = server_timing
+
+    async def __call__(self, scope, receive, send):
+        if scope["type"] != "http":
+            await self.app(scope, receive, send)
+            return
+
+        stats = RequestStats()
+        token = current_request.set(stats)
+        start = time.perf_counter()
+        status = 500
+
+        async def send_with_timing(message):
+            nonlocal status
+            if message["type"] == "http.response.start":
+                status = message["status"]
+                if self.server_timing:
+                    total_ms = (time.perf_counter() - start) * 1000
+                    MutableHeaders(raw=message["headers"]).append(
+                        "Server-Timing",
+                        f'db;dur={stats.db_seconds * 1000:.1f};desc="{stats.db_calls} queries", total;dur={total_ms:.1f}',
+                    )
+            await send(message)
+
+        metrics.in_flight += 1
+        try:
+            await self.app(scope, receive, send_with_timing)
+        finally:
+            metrics.in_flight -= 1
+            current_request.reset(token)
+            # Label by route template so ids in paths don't create a series each
+            route = getattr(scope.get("route"), "path", "unmatched")
+            metrics.observe_request(scope["method"], route, status, time.perf_counter() - start, stats)
@@ -1,5 +1,5 @@
 from pydantic import BaseModel
-from typing import Optional
+from typing import Dict, List, Optional
 
 class AdminModel(BaseModel):
     username: str
@@ -15,9 +15,28 @@ class PersonnelModel(BaseModel):
     x_coor: Optional[int] = None  # Optional, as some personnel might not have assigned coordinates
     y_coor: Optional[int] = None
 
+class LoginRequest(BaseModel):
+    email: str
+    password: str
+
 class UpdateCoordinatesNullRequest(BaseModel):
     personnel_id: int
 
+class SeatAssignment(BaseModel):
+    personnel_id: int
+    floor_id: int
+    x_coor: int
+    y_coor: int
+
+class BulkSeatAssignmentRequest(BaseModel):
+    assignments: List[SeatAssignment]
+
+class SeatingPlanRequest(BaseModel):
+    strategy: str = "compact"                    # "compact" or "spread"
+    teams: Optional[Dict[int, str]] = None       # personnel_id -> team, to keep teams together
+    personnel_ids: Optional[List[int]] = None    # Subset of unplaced personnel to seat (default: all)
+    commit: bool = False                         # Apply the plan instead of only proposing it
+
 
 class CreateItemRequest(BaseModel):
     state: bool        # State of the object (active/inactive)
@@ -44,6 +63,19 @@ class ObjectModel(BaseModel):
     o_type: int
     x_coor: int
     y_coor: int
+    width: int = 1     # Cells covered along x, starting at x_coor
+    length: int = 1    # Cells covered along y, starting at y_coor
+
+class ObjectPlacement(BaseModel):
+    state: bool
+    o_type: int
+    x_coor: int
+    y_coor: int
+    width: int = 1
+    length: int = 1
+
+class BulkObjectPlacementRequest(BaseModel):
+    placements: List[ObjectPlacement]
 
 class BuildingModel(BaseModel):
     floor_count: int
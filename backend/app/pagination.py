@@ -0,0 +1,95 @@
+# app/pagination.py
+"""
+Keyset (cursor) pagination and field projection for the list endpoints.
+
+List endpoints accept ?cursor=<last id seen>&limit=<n>&fields=a,b,c and keep
+returning a plain JSON array. When more rows exist, the id to pass as the next
+cursor is sent in the X-Next-Cursor response header.
+"""
+from typing import Optional
+from fastapi import HTTPException, Response
+from app.config import DEFAULT_PAGE_SIZE, MAX_PAGE_SIZE
+from app.database import table, execute
+
+# Columns each table may return. Passwords are never selectable.
+TABLE_FIELDS = {
+    "Admins": ["id", "username"],
+    "Buildings": ["id", "floor_count"],
+    "Feedbacks": ["id", "title", "personnelId", "feedback"],
+    "Floors": ["id", "building_id", "number", "length", "width", "capacity"],
+    "Objects": ["id", "state", "floor_id", "o_type", "x_coor", "y_coor", "width", "length"],
+    "Personnels": ["id", "name", "surname", "email", "floor_id", "gender", "x_coor", "y_coor"],
+}
+
+# Tables whose rows hold secrets, so the default projection lists columns instead of '*'
+PROTECTED_TABLES = {"Admins", "Personnels"}
+
+class PageParams:
+    """Query parameters shared by the paginated list endpoints (use with Depends())."""
+
+    def __init__(self, cursor: Optional[int] = None, limit: int = DEFAULT_PAGE_SIZE, fields: Optional[str] = None):
+        self.cursor = cursor
+        self.limit = max(1, min(limit, MAX_PAGE_SIZE))
+        self.fields = fields
+
+    def cache_key(self) -> str:
+        return f"cursor={self.cursor}&limit={self.limit}&fields={self.fields}"
+
+def select_list(table_name: str, fields: Optional[str]) -> str:
+    """Map ?fields=a,b to a Supabase select list, rejecting unknown or secret columns."""
+    if not fields:
+        if table_name in PROTECTED_TABLES:
+            return ", ".join(TABLE_FIELDS[table_name])
+        return "*"
+
+    allowed = TABLE_FIELDS[table_name]
+    requested = [f.strip() for f in fields.split(",") if f.strip()]
+    unknown = [f for f in requested if f not in allowed]
+    if unknown:
+        raise HTTPException(status_code=400, detail=f"Unknown fields for {table_name}: {', '.join(unknown)}")
+
+    # The cursor is the id, so it is always selected
+    if "id" not in requested:
+        requested.insert(0, "id")
+    return ", ".join(requested)
+
+async def fetch_page(table_name: str, page: PageParams, where=None) -> dict:
+    """
+    Fetch one page of table_name ordered by id. `where(query)` may add filters.
+    Returns {"items": rows, "next_cursor": id or None}.
+    """
+    query = table(table_name).select(select_list(table_name, page.fields))
+    if where is not None:
+        query = where(query)
+    if page.cursor is not None:
+        query = query.gt("id", page.cursor)
+
+    # Ask for one extra row to know whether another page exists
+    result = await execute(query.order("id").limit(page.limit + 1))
+    rows = result.data
+    if len(rows) > page.limit:
+        return {"items": rows[:page.limit], "next_cursor": rows[page.limit - 1]["id"]}
+    return {"items": rows, "next_cursor": None}
+
+def page_response(page: dict, response: Response) -> list:
+    """Return the rows of a page and advertise the next cursor in X-Next-Cursor."""
+    if page["next_cursor"] is not None:
+        response.headers["X-Next-Cursor"] = str(page["next_cursor"])
+    return page["items"]
+
+async def iter_pages(table_name: str, fields: Optional[str] = None, where=None, page_size: int = MAX_PAGE_SIZE):
+    """Yield every matching row of table_name as lists of rows, one keyset page at a time."""
+    page = PageParams(limit=page_size, fields=fields)
+    while True:
+        result = await fetch_page(table_name, page, where)
+        if result["items"]:
+            yield result["items"]
+        if result["next_cursor"] is None:
+            return
+        page.cursor = result["next_cursor"]
+
+async def iter_rows(table_name: str, fields: Optional[str] = None, where=None, page_size: int = MAX_PAGE_SIZE):
+    """Yield every matching row of table_name, one keyset page in memory at a time."""
+    async for rows in iter_pages(table_name, fields, where, page_size):
+        for row in rows:
+            yield row
@@ -0,0 +1,48 @@
+# app/responses.py
+"""
+Fast JSON rendering and response compression for large payloads.
+
+Endpoints returning big lists (objects of a building, floor summaries,
+layouts) return fast_json(data, response) instead of the data itself. FastAPI
+then skips jsonable_encoder, which walks every value of every row, and the
+body is rendered by orjson when it is installed (stdlib json otherwise).
+Supabase rows are plain JSON types, so nothing needs converting.
+
+GZip compression is applied to responses above GZIP_MIN_SIZE bytes for
+clients that accept it.
+"""
+import json
+from fastapi import Response
+from fastapi.responses import JSONResponse
+from starlette.datastructures import Headers
+from starlette.middleware.gzip import GZipMiddleware
+
+try:
+    import orjson
+except ImportError:  # Optional dependency: without it, the stdlib encoder is used
+    orjson = None
+
+class FastJSONResponse(JSONResponse):
+    def render(self, content) -> bytes:
+        if orjson is not None:
+            return orjson.dumps(content, option=orjson.OPT_NON_STR_KEYS)
+        return json.dumps(content, ensure_ascii=False, separators=(",", ":")).encode("utf-8")
+
+def fast_json(content, response: Response = None) -> FastJSONResponse:
+    """
+    Render content with FastJSONResponse, keeping the headers (ETag, X-Next-Cursor,
+    Cache-Control, ...) already set on the endpoint's injected `response`.
+    """
+    headers = None
+    if response is not None:
+        headers = {k: v for k, v in response.headers.items() if k != "content-length"}
+    return FastJSONResponse(content, headers=headers)
+
+class CompressionMiddleware(GZipMiddleware):
+    """GZip, except for Server-Sent Events, whose events would wait in the compressor."""
+
+    async def __call__(self, scope, receive, send):
+        if scope["type"] == "http" and "text/event-stream" in Headers(scope=scope).get("accept", ""):
+            await self.app(scope, receive, send)
+            return
+        await super().__call__(scope, receive, send)
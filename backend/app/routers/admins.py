@@ -1,13 +1,15 @@
-from fastapi import APIRouter, HTTPException, BackgroundTasks
-from app.database import supabase
+from fastapi import APIRouter, Depends, HTTPException, Response
+from app.database import table, execute
 from app.models import AdminModel
+from app.auth import without_password
+from app.pagination import PageParams, fetch_page, page_response, select_list
 
 router = APIRouter()
 
 @router.get("/fetch-admin/{admin_id}")
 async def fetch_admin(admin_id: int):
     try:
-        admin = supabase.table("Admins").select('*').eq("id", admin_id).execute()
+        admin = await execute(table("Admins").select(select_list("Admins", None)).eq("id", admin_id))
         if not admin.data:
             raise HTTPException(status_code=404, detail="Admin not found")
         return admin.data[0]
@@ -15,37 +17,39 @@ async def fetch_admin(admin_id: int):
         raise HTTPException(status_code=500, detail=f"Supabase query failed: {str(e)}")
 
 @router.get("/fetch-admins")
-async def fetch_admins():
+async def fetch_admins(response: Response, page: PageParams = Depends()):
     try:
-        admins = supabase.table("Admins").select('*').execute()
-        return admins.data
+        admins = await fetch_page("Admins", page)
+        return page_response(admins, response)
+    except HTTPException as http_err:
+        raise http_err
     except Exception as e:
         raise HTTPException(status_code=500, detail=f"Supabase query failed: {str(e)}")
 
 @router.post("/create-admin")
 async def create_admin(admin: AdminModel):
     try:
-        new_admin = supabase.table("Admins").insert(admin.dict()).execute()
-        return new_admin.data[0]
+        new_admin = await execute(table("Admins").insert(admin.dict()))
+        return without_password(new_admin.data[0])
     except Exception as e:
         raise HTTPException(status_code=500, detail=f"Supabase query failed: {str(e)}")
 
 @router.delete("/delete-admin/{admin_id}")
 async def delete_admin(admin_id: int):
     try:
-        admin = supabase.table("Admins").delete().eq("id", admin_id).execute()
+        admin = await execute(table("Admins").delete().eq("id", admin_id))
         if not admin.data:
             raise HTTPException(status_code=404, detail="Admin not found")
-        return admin.data[0]
+        return without_password(admin.data[0])
     except Exception as e:
         raise HTTPException(status_code=500, detail=f"Supabase query failed: {str(e)}")
 
 @router.put("/update-admin/{admin_id}")
 async def update_admin(admin_id: int, admin: AdminModel):
     try:
-        updated_admin = supabase.table("Admins").update(admin.dict()).eq("id", admin_id).execute()
+        updated_admin = await execute(table("Admins").update(admin.dict()).eq("id", admin_id))
         if not updated_admin.data:
             raise HTTPException(status_code=404, detail="Admin not found")
-        return updated_admin.data[0]
+        return without_password(updated_admin.data[0])
     except Exception as e:
         raise HTTPException(status_code=500, detail=f"Supabase query failed: {str(e)}")
\ No newline at end of file
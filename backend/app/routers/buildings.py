@@ -1,31 +1,93 @@
-from fastapi import APIRouter, HTTPException, BackgroundTasks
-from app.database import supabase
+import asyncio
+from fastapi import APIRouter, Depends, HTTPException, Response
+from app.database import table, execute
 from app.models import BuildingModel
+from app.cache import cache
+from app.pagination import PageParams, fetch_page, page_response, iter_rows
+from app.responses import fast_json
+from app.snapshot import build_snapshot
+from app.aggregates import aggregates
 
 router = APIRouter()
 
 @router.get("/fetch-building/{building_id}")
 async def fetch_building(building_id: int):
     try:
-        building = supabase.table("Buildings").select('*').eq("id", building_id).execute()
-        if not building.data:
+        async def load():
+            building = await execute(table("Buildings").select('*').eq("id", building_id))
+            return building.data[0] if building.data else None
+
+        building = await cache.get_or_load(f"buildings:{building_id}", load)
+        if not building:
             raise HTTPException(status_code=404, detail="Building not found")
-        return building.data[0]
+        return building
+    except Exception as e:
+        raise HTTPException(status_code=500, detail=f"Supabase query failed: {str(e)}")
+
+async def fetch_building_floors(building_id: int) -> list:
+    """The floors of a building (shared cache entry with fetch-floors/), 404 if it has none."""
+    async def load():
+        floors = await execute(table("Floors").select("*").filter("building_id", "eq", building_id))
+        return floors.data
+
+    floors = await cache.get_or_load(f"floors:building:{building_id}", load)
+    if not floors:
+        raise HTTPException(status_code=404, detail=f"No floors found for building {building_id}")
+    return floors
+
+@router.get("/buildings/{building_id}/summary")
+async def fetch_building_summary(building_id: int):
+    """Building totals and per-floor summaries, from the incremental aggregates."""
+    try:
+        floors = await fetch_building_floors(building_id)
+        return await aggregates.building_summary(building_id, [f["id"] for f in floors])
+    except HTTPException as http_err:
+        raise http_err
+    except Exception as e:
+        raise HTTPException(status_code=500, detail=f"Supabase query failed: {str(e)}")
+
+@router.get("/buildings/{building_id}/snapshot")
+async def fetch_building_snapshot(building_id: int, response: Response, format: str = "json"):
+    """
+    Floors, objects and personnel of a building in one columnar payload
+    (see app/snapshot.py). format=binary sends the numeric columns as base64
+    little-endian typed arrays.
+    """
+    if format not in ("json", "binary"):
+        raise HTTPException(status_code=400, detail="format must be 'json' or 'binary'")
+    try:
+        floors = await fetch_building_floors(building_id)
+        floor_ids = [f["id"] for f in floors]
+
+        async def collect(table_name: str, fields: str):
+            where = lambda query: query.in_("floor_id", floor_ids)
+            return [row async for row in iter_rows(table_name, fields, where)]
+
+        objects, personnel = await asyncio.gather(
+            collect("Objects", "id,floor_id,o_type,state,x_coor,y_coor,width,length"),
+            collect("Personnels", "id,floor_id,name,surname,x_coor,y_coor"),
+        )
+        return fast_json(build_snapshot(building_id, floors, objects, personnel, binary=format == "binary"), response)
+    except HTTPException as http_err:
+        raise http_err
     except Exception as e:
         raise HTTPException(status_code=500, detail=f"Supabase query failed: {str(e)}")
 
 @router.get("/fetch-buildings")
-async def fetch_buildings():
+async def fetch_buildings(response: Response, page: PageParams = Depends()):
     try:
-        buildings = supabase.table("Buildings").select('*').execute()
-        return buildings.data
+        buildings = await cache.get_or_load(f"buildings:all?{page.cache_key()}", lambda: fetch_page("Buildings", page))
+        return page_response(buildings, response)
+    except HTTPException as http_err:
+        raise http_err
     except Exception as e:
         raise HTTPException(status_code=500, detail=f"Supabase query failed: {str(e)}")
 
 @router.post("/create-building")
 async def create_building(building: BuildingModel):
     try:
-        new_building = supabase.table("Buildings").insert(building.dict()).execute()
+        new_building = await execute(table("Buildings").insert(building.dict()))
+        await cache.invalidate_prefix("buildings:all")
         return new_building.data[0]
     except Exception as e:
         raise HTTPException(status_code=500, detail=f"Supabase query failed: {str(e)}")
@@ -33,9 +95,12 @@ async def create_building(building: BuildingModel):
 @router.delete("/delete-building/{building_id}")
 async def delete_building(building_id: int):
     try:
-        building = supabase.table("Buildings").delete().eq("id", building_id).execute()
+        building = await execute(table("Buildings").delete().eq("id", building_id))
         if not building.data:
             raise HTTPException(status_code=404, detail="Building not found")
+        await cache.invalidate_prefix("buildings:all")
+        await cache.invalidate(f"buildings:{building_id}", f"floors:building:{building_id}")
+        await cache.invalidate_prefix(f"floors:building:{building_id}:")
         return building.data[0]
     except Exception as e:
         raise HTTPException(status_code=500, detail=f"Supabase query failed: {str(e)}")
@@ -43,9 +108,11 @@ async def delete_building(building_id: int):
 @router.put("/update-building/{building_id}")
 async def update_building(building_id: int, building: BuildingModel):
     try:
-        updated_building = supabase.table("Buildings").update(building.dict()).eq("id", building_id).execute()
+        updated_building = await execute(table("Buildings").update(building.dict()).eq("id", building_id))
         if not updated_building.data:
             raise HTTPException(status_code=404, detail="Building not found")
+        await cache.invalidate_prefix("buildings:all")
+        await cache.invalidate(f"buildings:{building_id}")
         return updated_building.data[0]
     except Exception as e:
         raise HTTPException(status_code=500, detail=f"Supabase query failed: {str(e)}")
@@ -0,0 +1,82 @@
+from fastapi import APIRouter, HTTPException
+from fastapi.responses import StreamingResponse
+from typing import Optional
+import csv
+import io
+import json
+from app.database import table, execute
+from app.pagination import TABLE_FIELDS, select_list, iter_pages
+
+router = APIRouter()
+
+MEDIA_TYPES = {
+    "ndjson": "application/x-ndjson",
+    "csv": "text/csv",
+}
+
+async def encode_pages(pages, columns: list, format: str):
+    """Turn an async iterator of row pages into NDJSON lines or CSV text, one chunk per page."""
+    if format == "ndjson":
+        async for rows in pages:
+            yield "".join(json.dumps(row, default=str) + "\n" for row in rows)
+        return
+
+    buffer = io.StringIO()
+    writer = csv.DictWriter(buffer, fieldnames=columns, extrasaction="ignore")
+    writer.writeheader()
+    async for rows in pages:
+        writer.writerows(rows)
+        yield buffer.getvalue()
+        buffer.seek(0)
+        buffer.truncate()
+    # An export with no rows is still a CSV header
+    if buffer.getvalue():
+        yield buffer.getvalue()
+
+def export_response(table_name: str, format: str, fields: Optional[str], where=None) -> StreamingResponse:
+    """
+    Stream a table export. Rows are fetched and sent one keyset page at a time, so
+    memory stays constant, the first rows go out before the last page is fetched,
+    and the response is a few large chunks rather than one per row.
+    """
+    if format not in MEDIA_TYPES:
+        raise HTTPException(status_code=400, detail="format must be 'ndjson' or 'csv'")
+
+    # Export a stable column set, validated like the list endpoints
+    columns = select_list(table_name, fields or ",".join(TABLE_FIELDS[table_name])).split(", ")
+    pages = iter_pages(table_name, ",".join(columns), where)
+    return StreamingResponse(
+        encode_pages(pages, columns, format),
+        media_type=MEDIA_TYPES[format],
+        headers={"Content-Disposition": f'attachment; filename="{table_name.lower()}.{format}"'},
+    )
+
+@router.get("/export-objects")
+async def export_objects(floor_id: int = None, building_id: int = None, format: str = "ndjson", fields: Optional[str] = None):
+    try:
+        floor_ids = None
+        if building_id:
+            floors = await execute(table("Floors").select("id").eq("building_id", building_id))
+            floor_ids = [floor["id"] for floor in floors.data]
+
+        def where(query):
+            if floor_id:
+                query = query.eq("floor_id", floor_id)
+            if floor_ids is not None:
+                query = query.in_("floor_id", floor_ids)
+            return query
+
+        return export_response("Objects", format, fields, where)
+    except HTTPException as http_err:
+        raise http_err
+    except Exception as e:
+        raise HTTPException(status_code=500, detail=f"Supabase query failed: {str(e)}")
+
+@router.get("/export-personnels")
+async def export_personnels(floor_id: int = None, format: str = "ndjson", fields: Optional[str] = None):
+    where = (lambda query: query.eq("floor_id", floor_id)) if floor_id else None
+    return export_response("Personnels", format, fields, where)
+
+@router.get("/export-feedbacks")
+async def export_feedbacks(format: str = "ndjson", fields: Optional[str] = None):
+    return export_response("Feedbacks", format, fields)
@@ -1,13 +1,18 @@
-from fastapi import APIRouter, Depends, HTTPException
-from app.database import supabase
+from typing import Optional
+from fastapi import APIRouter, Depends, HTTPException, Response
+from app.database import table, execute
 from app.models import FeedbackModel
+from app.pagination import PageParams, fetch_page, page_response
+from app.config import MAX_PAGE_SIZE
+from app.search import feedback_index
+from app.aggregates import aggregates
 
 router = APIRouter()
 
 @router.get("/fetch-feedback/{feedback_id}")
 async def fetch_feedback(feedback_id: int):
     try:
-        feedback = supabase.table("Feedbacks").select('*').eq("id", feedback_id).execute()
+        feedback = await execute(table("Feedbacks").select('*').eq("id", feedback_id))
         if not feedback.data:
             raise HTTPException(status_code=404, detail="Feedback not found")
         return feedback.data[0]
@@ -15,17 +20,46 @@ async def fetch_feedback(feedback_id: int):
         raise HTTPException(status_code=500, detail=f"Supabase query failed: {str(e)}")
 
 @router.get("/fetch-feedbacks")
-async def fetch_feedbacks():
+async def fetch_feedbacks(response: Response, page: PageParams = Depends()):
     try:
-        feedbacks = supabase.table("Feedbacks").select('*').execute()
-        return feedbacks.data
+        feedbacks = await fetch_page("Feedbacks", page)
+        return page_response(feedbacks, response)
+    except HTTPException as http_err:
+        raise http_err
+    except Exception as e:
+        raise HTTPException(status_code=500, detail=f"Supabase query failed: {str(e)}")
+
+@router.get("/search-feedbacks")
+async def search_feedbacks(q: str = "", personnelId: Optional[int] = None, floor_id: Optional[int] = None,
+                           offset: int = 0, limit: int = 20):
+    """
+    Full-text search over feedback titles and texts, best matches first (see
+    app/search.py). Filters by author (personnelId) and by the floor the author
+    is on. Page with offset/limit; nextOffset is null on the last page.
+    """
+    if offset < 0 or limit < 1:
+        raise HTTPException(status_code=400, detail="offset must be >= 0 and limit >= 1")
+    try:
+        personnel_ids = None
+        if floor_id is not None:
+            personnel_ids = await aggregates.floor_personnel(floor_id)
+            if personnel_ids is None:
+                raise HTTPException(status_code=404, detail="Floor not found")
+        if personnelId is not None:
+            personnel_ids = {personnelId} if personnel_ids is None else personnel_ids & {personnelId}
+
+        await feedback_index.ensure_loaded()
+        return feedback_index.search(q, personnel_ids, offset, min(limit, MAX_PAGE_SIZE))
+    except HTTPException as http_err:
+        raise http_err
     except Exception as e:
         raise HTTPException(status_code=500, detail=f"Supabase query failed: {str(e)}")
 
 @router.post("/create-feedback")
 async def create_feedback(feedback: FeedbackModel):
     try:
-        new_feedback = supabase.table("Feedbacks").insert(feedback.dict()).execute()
+        new_feedback = await execute(table("Feedbacks").insert(feedback.dict()))
+        feedback_index.add(new_feedback.data[0])
         return new_feedback.data[0]
     except Exception as e:
         raise HTTPException(status_code=500, detail=f"Supabase query failed: {str(e)}")
@@ -33,9 +67,10 @@ async def create_feedback(feedback: FeedbackModel):
 @router.delete("/delete-feedback/{feedback_id}")
 async def delete_feedback(feedback_id: int):
     try:
-        feedback = supabase.table("Feedbacks").delete().eq("id", feedback_id).execute()
+        feedback = await execute(table("Feedbacks").delete().eq("id", feedback_id))
         if not feedback.data:
             raise HTTPException(status_code=404, detail="Feedback not found")
+        feedback_index.remove(feedback_id)
         return feedback.data[0]
     except Exception as e:
         raise HTTPException(status_code=500, detail=f"Supabase query failed: {str(e)}")
@@ -1,70 +1,127 @@
-from fastapi import APIRouter, Depends, HTTPException, BackgroundTasks
-from app.database import supabase
+from fastapi import APIRouter, Depends, HTTPException, Request, Response
+from fastapi.responses import StreamingResponse
+from app.config import CREATE_BUILDING_RPC
+from app.database import table, rpc, execute
+from app.layout import expand_cells, fetch_floor_objects
+from app.cache import cache
+from app.pagination import PageParams, fetch_page, page_response, iter_rows
+from app import spatial
+from app.heatmap import compute_heatmap
+from app.events import broker, sse_stream
+from app.changelog import changelog, EPOCH
+from app.aggregates import aggregates
+from app.jobs import Job, jobs, accepted
+from app.conditional import not_modified, version_etag
+from app.responses import fast_json
 from app.models import FloorModel
+from typing import Optional
 import logging
+import time
 
 router = APIRouter()
 
 @router.get("/fetch-floor/{floor_id}")
 async def fetch_floor(floor_id: int):
     try:
-        floor = supabase.table("Floors").select('*').eq("id", floor_id).execute()
-        if not floor.data:
+        async def load():
+            floor = await execute(table("Floors").select('*').eq("id", floor_id))
+            return floor.data[0] if floor.data else None
+
+        floor = await cache.get_or_load(f"floors:{floor_id}", load)
+        if not floor:
             raise HTTPException(status_code=404, detail="Floor not found")
-        return floor.data[0]
+        return floor
     except Exception as e:
         raise HTTPException(status_code=500, detail=f"Supabase query failed: {str(e)}")
 
 @router.get("/fetch-floors")
-async def fetch_floors():
+async def fetch_floors(response: Response, page: PageParams = Depends()):
     try:
-        floors = supabase.table("Floors").select('*').execute()
-        return floors.data
+        floors = await cache.get_or_load(f"floors:all?{page.cache_key()}", lambda: fetch_page("Floors", page))
+        return page_response(floors, response)
+    except HTTPException as http_err:
+        raise http_err
     except Exception as e:
         raise HTTPException(status_code=500, detail=f"Supabase query failed: {str(e)}")
 
-@router.post("/create-floor")
-async def create_floor(floor_data: dict):
-    try:
-        floors = floor_data.get("floors", [])
-        total_square_meters = floor_data.get("totalSquareMeters")
-
-        # Ensure floors data is provided
-        if not floors:
-            raise HTTPException(status_code=400, detail="No floors data provided")
-
+async def create_building_with_floors(floors: list, total_square_meters, job: Optional[Job] = None) -> dict:
+    """
+    Create a building together with its floors. Floor numbers are assigned
+    locally (1..N in request order) and all floors are written in one bulk
+    insert, or in one transaction when CREATE_BUILDING_RPC is enabled.
+    """
+    started = time.perf_counter()
+    round_trips = 1 if CREATE_BUILDING_RPC else 2
+    if job is not None:
+        job.report(0, round_trips)
+
+    if CREATE_BUILDING_RPC:
+        created = await execute(rpc("create_building_with_floors", {"floors": floors}))
+        building_id = created.data["building_id"]
+    else:
         # Step 1: Insert the building with the given floor_count
-        building_data = {"floor_count": len(floors)}
-        new_building = supabase.table("Buildings").insert(building_data).execute()
+        new_building = await execute(table("Buildings").insert({"floor_count": len(floors)}))
 
         if not new_building.data:
             raise HTTPException(status_code=500, detail="Failed to create building")
 
         building_id = new_building.data[0]['id']
+        if job is not None:
+            job.report(1)
 
-        # Step 2: Insert each floor and link it to the building_id
-        for index, floor in enumerate(floors):
-            floor_data_with_building_id = {
+        # Step 2: Insert every floor at once, numbered in request order
+        floors_to_insert = [
+            {
                 **floor,
                 "building_id": building_id,
+                "number": index + 1,
                 "length": floor.get("length", 0),  # Ensure length is included
                 "width": floor.get("width", 0),     # Ensure width is included
             }
+            for index, floor in enumerate(floors)
+        ]
+
+        try:
+            new_floors = await execute(table("Floors").insert(floors_to_insert))
+        except Exception:
+            new_floors = None
+
+        if not new_floors or not new_floors.data:
+            # Don't leave a building without floors behind
+            await execute(table("Buildings").delete().eq("id", building_id))
+            raise HTTPException(status_code=500, detail="Failed to create floors")
+
+    if job is not None:
+        job.report(round_trips)
+    await cache.invalidate_prefix("buildings:all")
+    await cache.invalidate_prefix("floors:all")
+    await cache.invalidate(f"floors:building:{building_id}")
+
+    return {
+        "message": "Building and Floors created successfully",
+        "buildingId": building_id,
+        "totalSquareMeters": total_square_meters,
+        "roundTrips": round_trips,
+        "elapsedMs": round((time.perf_counter() - started) * 1000, 2),
+    }
 
-            # Get the current highest floor number for the given building_id
-            existing_floors = supabase.table("Floors").select("number").eq("building_id", building_id).execute()
-            highest_floor_number = max([f["number"] for f in existing_floors.data], default=0)
-
-            # Set the new floor number (the next available number)
-            floor_data_with_building_id["number"] = highest_floor_number + 1
-
-            # Insert the floor with the new "number"
-            new_floor = supabase.table("Floors").insert(floor_data_with_building_id).execute()
+@router.post("/create-floor")
+async def create_floor(floor_data: dict, background: bool = False):
+    """
+    Create a building and its floors. With ?background=true the work is queued
+    and the response is 202 with a job to poll at /jobs/{id}.
+    """
+    try:
+        floors = floor_data.get("floors", [])
+        total_square_meters = floor_data.get("totalSquareMeters")
 
-            if not new_floor.data:
-                raise HTTPException(status_code=500, detail=f"Failed to create floor {index + 1}")
+        # Ensure floors data is provided
+        if not floors:
+            raise HTTPException(status_code=400, detail="No floors data provided")
 
-        return {"message": "Building and Floors created successfully", "totalSquareMeters": total_square_meters}
+        if background:
+            return accepted(jobs.submit("create-floor", create_building_with_floors, floors, total_square_meters))
+        return await create_building_with_floors(floors, total_square_meters)
 
     except HTTPException as http_err:
         raise http_err  # Rethrow HTTP exceptions
@@ -75,79 +132,91 @@ async def create_floor(floor_data: dict):
 @router.delete("/delete-floor/{floor_id}")
 async def delete_floor(floor_id: int):
     try:
-        floor = supabase.table("Floors").delete().eq("id", floor_id).execute()
+        floor = await execute(table("Floors").delete().eq("id", floor_id))
         if not floor.data:
             raise HTTPException(status_code=404, detail="Floor not found")
-        return floor.data[0]
+        spatial.floor_changed(floor_id)
+        deleted = floor.data[0]
+        await cache.invalidate_prefix("floors:all")
+        await cache.invalidate(
+            f"floors:{floor_id}", f"objects:floor:{floor_id}",
+            f"floors:building:{deleted['building_id']}",
+            f"floors:building:{deleted['building_id']}:number:{deleted['number']}"
+        )
+        return deleted
     except Exception as e:
         raise HTTPException(status_code=500, detail=f"Supabase query failed: {str(e)}")
 
 @router.put("/update-floor/{floor_id}")
 async def update_floor(floor_id: int, floor: FloorModel):
     try:
-        updated_floor = supabase.table("Floors").update(floor.dict()).eq("id", floor_id).execute()
+        updated_floor = await execute(table("Floors").update(floor.dict()).eq("id", floor_id))
         if not updated_floor.data:
             raise HTTPException(status_code=404, detail="Floor not found")
+        spatial.floor_changed(floor_id)
+        # The building or number may have changed, so drop every floor entry
+        await cache.invalidate_prefix("floors:")
         return updated_floor.data[0]
     except Exception as e:
         raise HTTPException(status_code=500, detail=f"Supabase query failed: {str(e)}")
 
+async def build_floor_summaries(floors_data: list) -> list:
+    """
+    Attach occupantCount, capacity, area, tableCoordinates and the user list to
+    each floor. Personnels for all floors are fetched with one keyset-paged
+    query and grouped in memory, so the cost does not grow with the number of floors.
+    """
+    floor_ids = [f["id"] for f in floors_data]
+    personnels_by_floor = {floor_id: [] for floor_id in floor_ids}
+    async for p in iter_rows(
+        "Personnels", "floor_id,name,surname,x_coor,y_coor", lambda query: query.in_("floor_id", floor_ids)
+    ):
+        personnels_by_floor[p["floor_id"]].append(p)
+
+    result = []
+    for f in floors_data:
+        floor_number = f["number"]      # We'll treat 'number' as the front-end ID
+        length = f.get("length", 0)
+        width = f.get("width", 0)
+        area = length * width
+        personnel_data = personnels_by_floor[f["id"]]
+
+        # Build tableCoordinates from x_coor, y_coor and the user list from name + surname
+        table_coords = []
+        user_list = []
+        for p in personnel_data:
+            table_coords.append({"x": p.get("x_coor", 0), "z": p.get("y_coor", 0)})
+            user_list.append(f"{p.get('name', '')} {p.get('surname', '')}".strip())
+
+        result.append({
+            "id": floor_number,               # from the 'number' column
+            "name": f"Floor {floor_number}",
+            "area": area,
+            "occupantCount": len(personnel_data),
+            "capacity": area,
+            "tableCoordinates": table_coords,
+            "users": user_list
+        })
+
+    return result
+
 @router.get("/fetch-floors-with-personnels/{building_id}")
-async def fetch_floors_with_personnels(building_id: int):
+async def fetch_floors_with_personnels(building_id: int, response: Response):
     """
     Fetch floors by building_id, then attach occupantCount, capacity, area, 
     tableCoordinates, and user list from the Personnels table.
     """
     try:
-        # 1. Get all floors for the given building_id
-        floors_response = supabase.table("Floors").select("*").eq("building_id", building_id).execute()
+        floors_response = await execute(table("Floors").select("*").eq("building_id", building_id))
         floors_data = floors_response.data
 
         if not floors_data:
             raise HTTPException(status_code=404, detail="No floors found for this building.")
 
-        # 2. For each floor, fetch personnels and build the structure
-        result = []
-        for f in floors_data:
-            floor_id_db = f["id"]           # The actual ID in the Floors table
-            floor_number = f["number"]      # We'll treat 'number' as the front-end ID
-            length = f.get("length", 0)
-            width = f.get("width", 0)
-            area = length * width
-            capacity = area
-
-            # 2a. Fetch all personnels for this floor
-            personnel_response = supabase.table("Personnels").select("*").eq("floor_id", floor_id_db).execute()
-            personnel_data = personnel_response.data
-
-            # 2b. occupantCount is just how many personnels we have
-            occupant_count = len(personnel_data)
-
-            # 2c. Build tableCoordinates from x_coor, y_coor
-            table_coords = []
-            user_list = []
-            for p in personnel_data:
-                x_coor = p.get("x_coor", 0)
-                y_coor = p.get("y_coor", 0)
-                table_coords.append({"x": x_coor, "z": y_coor})
-
-                # For the user list, combine name + surname (or adapt as you like)
-                full_name = f"{p.get('name', '')} {p.get('surname', '')}".strip()
-                user_list.append(full_name)
-
-            # 2d. Build the final object for the front-end
-            floor_obj = {
-                "id": floor_number,               # from the 'number' column
-                "name": f"Floor {floor_number}",  # or any naming convention you prefer
-                "area": area,
-                "occupantCount": occupant_count,
-                "capacity": capacity,
-                "tableCoordinates": table_coords,
-                "users": user_list
-            }
-            result.append(floor_obj)
+        return fast_json(await build_floor_summaries(floors_data), response)
 
-        return result
+    except HTTPException as http_err:
+        raise http_err
 
     except Exception as e:
         logging.error(f"Error in fetch_floors_with_personnels: {str(e)}")
@@ -155,14 +224,14 @@ async def fetch_floors_with_personnels(building_id: int):
     
 
 @router.get("/fetch-latest-building-floors-with-personnels")
-async def fetch_latest_building_floors_with_personnels():
+async def fetch_latest_building_floors_with_personnels(response: Response):
     """
     Fetch floors of the latest building, then attach occupantCount, capacity, area, 
     tableCoordinates, and user list from the Personnels table.
     """
     try:
         # 1. Fetch the latest building based on the highest ID or latest timestamp
-        latest_building_response = supabase.table("Buildings").select("id").order("id", desc=True).limit(1).execute()
+        latest_building_response = await execute(table("Buildings").select("id").order("id", desc=True).limit(1))
         latest_building_data = latest_building_response.data
 
         if not latest_building_data:
@@ -171,50 +240,16 @@ async def fetch_latest_building_floors_with_personnels():
         latest_building_id = latest_building_data[0]["id"]
 
         # 2. Fetch floors for this building
-        floors_response = supabase.table("Floors").select("*").eq("building_id", latest_building_id).execute()
+        floors_response = await execute(table("Floors").select("*").eq("building_id", latest_building_id))
         floors_data = floors_response.data
 
         if not floors_data:
             raise HTTPException(status_code=404, detail="No floors found for this building.")
 
-        # 3. Process each floor
-        result = []
-        for f in floors_data:
-            floor_id_db = f["id"]
-            floor_number = f["number"]
-            length = f.get("length", 0)
-            width = f.get("width", 0)
-            area = length * width
-            capacity = area
-
-            # 4. Fetch personnels for this floor
-            personnel_response = supabase.table("Personnels").select("*").eq("floor_id", floor_id_db).execute()
-            personnel_data = personnel_response.data
-
-            occupant_count = len(personnel_data)
-            table_coords = []
-            user_list = []
-
-            for p in personnel_data:
-                x_coor = p.get("x_coor", 0)
-                y_coor = p.get("y_coor", 0)
-                table_coords.append({"x": x_coor, "z": y_coor})
-
-                full_name = f"{p.get('name', '')} {p.get('surname', '')}".strip()
-                user_list.append(full_name)
-
-            floor_obj = {
-                "id": floor_number,
-                "name": f"Floor {floor_number}",
-                "area": area,
-                "occupantCount": occupant_count,
-                "capacity": capacity,
-                "tableCoordinates": table_coords,
-                "users": user_list
-            }
-            result.append(floor_obj)
+        return fast_json(await build_floor_summaries(floors_data), response)
 
-        return result
+    except HTTPException as http_err:
+        raise http_err
 
     except Exception as e:
         logging.error(f"Error in fetch_latest_building_floors_with_personnels: {str(e)}")
@@ -224,20 +259,28 @@ async def fetch_latest_building_floors_with_personnels():
 @router.get("/fetch-floor-by-building/{building_id}/{floor_number}")
 async def fetch_floor_by_building(building_id: int, floor_number: int):
     try:
-        floor = supabase.table("Floors").select('*').eq("building_id", building_id).eq("number", floor_number).execute()
-        if not floor.data:
+        async def load():
+            floor = await execute(table("Floors").select('*').eq("building_id", building_id).eq("number", floor_number))
+            return floor.data[0] if floor.data else None
+
+        floor = await cache.get_or_load(f"floors:building:{building_id}:number:{floor_number}", load)
+        if not floor:
             raise HTTPException(status_code=404, detail="Floor not found")
-        return floor.data[0]
+        return floor
     except Exception as e:
         raise HTTPException(status_code=500, detail=f"Supabase query failed: {str(e)}")
 
 @router.get("/fetch-floors/{building_id}")
 async def fetch_floors_for_building(building_id: int):
     try:
-        floors = supabase.table("Floors").select("*").filter("building_id", "eq", building_id).execute()
-        if not floors.data:
+        async def load():
+            floors = await execute(table("Floors").select("*").filter("building_id", "eq", building_id))
+            return floors.data
+
+        floors = await cache.get_or_load(f"floors:building:{building_id}", load)
+        if not floors:
             raise HTTPException(status_code=404, detail=f"No floors found for building {building_id}")
-        return floors.data
+        return floors
     except Exception as e:
         raise HTTPException(status_code=500, detail=f"Supabase query failed: {str(e)}")
 
@@ -245,7 +288,7 @@ async def fetch_floors_for_building(building_id: int):
 async def fetch_floor_id(building_id: int, floor_number: int):
     try:
         # Query the Floors table to get the floor ID based on building_id and floor number
-        floor = supabase.table("Floors").select("id").eq("building_id", building_id).eq("number", floor_number).execute()
+        floor = await execute(table("Floors").select("id").eq("building_id", building_id).eq("number", floor_number))
         
         if floor.data and len(floor.data) > 0:
             return {"id": floor.data[0]["id"]}
@@ -258,47 +301,168 @@ async def fetch_floor_id(building_id: int, floor_number: int):
 @router.post("/create-object")
 async def create_object(object_data: dict):
     try:
-        # Extract object details
-        floor_id = object_data["floor_id"]
-        o_type = object_data["o_type"]
-        state = object_data["state"]
-        x_coor = object_data["x_coor"]
-        y_coor = object_data["y_coor"]
         width = object_data["width"]
         length = object_data["length"]
 
-        # Create list of objects to insert
-        objects_to_insert = []
-        for dx in range(width):
-            for dy in range(length):
-                new_x = x_coor + dx
-                new_y = y_coor + dy
-
-                objects_to_insert.append({
-                    "state": state,
-                    "floor_id": floor_id,
-                    "o_type": o_type,
-                    "x_coor": new_x,
-                    "y_coor": new_y
-                })
-
-        # Insert all objects at once
-        result = supabase.table("Objects").insert(objects_to_insert).execute()
+        index = await spatial.get_floor_index(object_data["floor_id"])
+        error = index.check_object_placement(object_data["x_coor"], object_data["y_coor"], width, length, object_data["o_type"])
+        if error:
+            raise HTTPException(status_code=409, detail=error)
+
+        # Store the whole piece of furniture as one rectangle
+        new_object = {
+            "state": object_data["state"],
+            "floor_id": object_data["floor_id"],
+            "o_type": object_data["o_type"],
+            "x_coor": object_data["x_coor"],
+            "y_coor": object_data["y_coor"],
+            "width": width,
+            "length": length
+        }
+        result = await execute(table("Objects").insert(new_object))
 
         if not result.data:
             raise HTTPException(status_code=500, detail="Failed to insert objects")
+        spatial.object_saved(result.data[0])
+        await cache.invalidate(f"objects:floor:{object_data['floor_id']}")
 
-        return {"message": "Objects inserted successfully", "count": len(objects_to_insert)}
+        # count is the number of cells covered, as before objects were stored as rectangles
+        return {"message": "Objects inserted successfully", "id": result.data[0]["id"], "count": width * length}
     
+    except HTTPException as http_err:
+        raise http_err
     except Exception as e:
         raise HTTPException(status_code=500, detail=f"Supabase query failed: {str(e)}")
 
 @router.get("/fetch-objects/{floor_id}")
-async def fetch_objects(floor_id: int):
+async def fetch_objects(floor_id: int, request: Request, response: Response, expand: Optional[str] = None):
     try:
-        objects = supabase.table("Objects").select("*").eq("floor_id", floor_id).execute()
-        if not objects.data:
+        index = spatial.loaded_floor_index(floor_id)
+        if index is not None:
+            etag = version_etag("objects", floor_id, EPOCH, index.loaded_at, index.version, expand)
+            cached = not_modified(request, etag, response)
+            if cached is not None:
+                return cached
+            response.headers["ETag"] = etag
+
+        objects = await fetch_floor_objects(floor_id)
+        if not objects:
             raise HTTPException(status_code=404, detail="No objects found")
-        return objects.data
+        if expand == "cells":
+            objects = expand_cells(objects)
+        return fast_json(objects, response)
+    except Exception as e:
+        raise HTTPException(status_code=500, detail=f"Supabase query failed: {str(e)}")
+
+@router.get("/fetch-cell/{floor_id}/{x_coor}/{y_coor}")
+async def fetch_cell(floor_id: int, x_coor: int, y_coor: int):
+    """What is at (x, y): the object covering the cell and the personnel seated on it."""
+    index = await spatial.get_floor_index(floor_id)
+    return {
+        "object": index.object_at(x_coor, y_coor),
+        "personnel_id": index.personnel_at(x_coor, y_coor),
+    }
+
+@router.get("/check-free-area/{floor_id}")
+async def check_free_area(floor_id: int, x_coor: int, y_coor: int, width: int = 1, length: int = 1):
+    """Whether a width x length rectangle starting at (x, y) is inside the floor and free of objects."""
+    index = await spatial.get_floor_index(floor_id)
+    free = index.in_bounds(x_coor, y_coor, width, length) and index.is_free(x_coor, y_coor, width, length)
+    return {"free": free}
+
+@router.get("/fetch-nearest-free-desk/{floor_id}/{x_coor}/{y_coor}")
+async def fetch_nearest_free_desk(floor_id: int, x_coor: int, y_coor: int):
+    index = await spatial.get_floor_index(floor_id)
+    desk = index.nearest_free_desk(x_coor, y_coor)
+    if desk is None:
+        raise HTTPException(status_code=404, detail="No free desk on this floor")
+    return {"x_coor": desk[0], "y_coor": desk[1], "object": index.object_at(*desk)}
+
+@router.get("/fetch-floor-heatmap/{floor_id}")
+async def fetch_floor_heatmap(floor_id: int, request: Request, response: Response, radius: int = 3, zone_size: int = 10, resolution: int = 100, format: str = "grid"):
+    """
+    Crowd density and utilization of a floor. format=grid returns density as a
+    nested list; format=binary returns it as base64 uint8 (row-major, `shape`).
+    Results are cached until the floor's occupancy index changes.
+    """
+    if format not in ("grid", "binary"):
+        raise HTTPException(status_code=400, detail="format must be 'grid' or 'binary'")
+    if radius < 0 or zone_size < 1 or resolution < 1:
+        raise HTTPException(status_code=400, detail="radius must be >= 0, zone_size and resolution >= 1")
+
+    index = await spatial.get_floor_index(floor_id)
+    if not index.width or not index.length:
+        raise HTTPException(status_code=400, detail="Floor has no dimensions")
+
+    etag = version_etag("heatmap", floor_id, EPOCH, index.loaded_at, index.version, radius, zone_size, resolution, format)
+    cached = not_modified(request, etag, response)
+    if cached is not None:
+        return cached
+    response.headers["ETag"] = etag
+
+    # The index version changes with every write, so stale heatmaps are never served
+    key = f"heatmap:floor:{floor_id}:{index.loaded_at}:{index.version}:{radius}:{zone_size}:{resolution}:{format}"
+
+    async def load():
+        return compute_heatmap(index, radius, zone_size, resolution, binary=format == "binary")
+
+    return fast_json(await cache.get_or_load(key, load), response)
+
+@router.get("/floors/{floor_id}/summary")
+async def fetch_floor_summary(floor_id: int):
+    """Occupants, objects by o_type and free cells of a floor, from the incremental aggregates."""
+    try:
+        summary = await aggregates.floor_summary(floor_id)
+        if summary is None:
+            raise HTTPException(status_code=404, detail="Floor not found")
+        return summary
+    except HTTPException as http_err:
+        raise http_err
+    except Exception as e:
+        raise HTTPException(status_code=500, detail=f"Supabase query failed: {str(e)}")
+
+@router.get("/floor-events/{floor_id}")
+async def floor_events(floor_id: int, request: Request):
+    """
+    Live changes to a floor's objects and personnel as Server-Sent Events.
+    Clients load the floor once, then apply the deltas; on a "resync" event they load it again.
+    """
+    # Loading the index makes moves off this floor visible to the hooks (and 404s unknown floors)
+    await spatial.get_floor_index(floor_id)
+    subscription = broker.subscribe(floor_id)
+    return StreamingResponse(
+        sse_stream(request, subscription),
+        media_type="text/event-stream",
+        headers={"Cache-Control": "no-cache", "X-Accel-Buffering": "no"},
+    )
+
+@router.get("/floors/{floor_id}/changes")
+async def fetch_floor_changes(floor_id: int, since: Optional[int] = None, epoch: Optional[str] = None):
+    """
+    Objects and personnel of a floor changed after layout version `since`.
+    Pass back the `version` and `epoch` of the previous response. Without `since`,
+    or when the change log no longer covers it, a full snapshot is returned
+    ("snapshot": true) and the client replaces its copy instead of patching it.
+    """
+    try:
+        # The loaded index is what notices personnel leaving this floor
+        index = await spatial.get_floor_index(floor_id)
+        version = changelog.floor(floor_id).version
+        result = {"floor_id": floor_id, "epoch": EPOCH, "version": version}
+
+        delta = None
+        if since is not None and epoch in (None, EPOCH):
+            delta = changelog.delta(floor_id, since)
+        if delta is not None:
+            return {**result, "snapshot": False, **delta}
+
+        # Objects come from the index, consistent with `version`; personnel rows changed
+        # while they load are simply sent again in the next delta
+        objects = list(index.objects.values())
+        personnel = [p async for p in iter_rows("Personnels", None, lambda query: query.eq("floor_id", floor_id))]
+        return fast_json({**result, "snapshot": True, "objects": objects, "deletedObjects": [],
+                          "personnel": personnel, "removedPersonnel": []})
+    except HTTPException as http_err:
+        raise http_err
     except Exception as e:
         raise HTTPException(status_code=500, detail=f"Supabase query failed: {str(e)}")
@@ -1,13 +1,26 @@
-from fastapi import APIRouter, HTTPException, BackgroundTasks
-from app.database import supabase
-from app.models import ObjectModel, UpdateItemCoordinatesRequest, CreateItemRequest, UpdateObjectModel
+from fastapi import APIRouter, Depends, HTTPException, Request, Response
+from typing import List, Optional
+import logging
+from app.database import table, execute
+from app.layout import expand_cells, fetch_floor_objects
+from app.cache import cache
+from app.pagination import PageParams, fetch_page, page_response
+from app.models import (
+    ObjectModel, UpdateItemCoordinatesRequest, CreateItemRequest, UpdateObjectModel,
+    ObjectPlacement, BulkObjectPlacementRequest,
+)
+from app import spatial
+from app.changelog import EPOCH
+from app.conditional import not_modified, version_etag
+from app.responses import fast_json
+from app.jobs import Job, jobs, accepted
 
 router = APIRouter()
 
 @router.get("/fetch-object/{object_id}")
 async def fetch_object(object_id: int):
     try:
-        object = supabase.table("Objects").select('*').eq("id", object_id).execute()
+        object = await execute(table("Objects").select('*').eq("id", object_id))
         if not object.data:
             raise HTTPException(status_code=404, detail="object not found")
         return object.data[0]
@@ -15,23 +28,31 @@ async def fetch_object(object_id: int):
         raise HTTPException(status_code=500, detail=f"Supabase query failed: {str(e)}")
 
 @router.get("/fetch-objects/")
-async def fetch_objects(floor_id: int = None, building_id: int = None):
+async def fetch_objects(response: Response, floor_id: int = None, building_id: int = None,
+                        expand: Optional[str] = None, page: PageParams = Depends()):
     try:
-        query = supabase.table("Objects").select('*')
-
-        # Apply floor_id filter
-        if floor_id:
-            query = query.eq("floor_id", floor_id)
-
         # If building_id is provided, filter floors to get the corresponding floors
+        floor_ids = None
         if building_id:
-            floors = supabase.table("Floors").select("id").eq("building_id", building_id).execute()
+            floors = await execute(table("Floors").select("id").eq("building_id", building_id))
             floor_ids = [floor["id"] for floor in floors.data]
-            query = query.in_("floor_id", floor_ids)
 
-        objects = query.execute()
+        def where(query):
+            # Apply floor_id filter
+            if floor_id:
+                query = query.eq("floor_id", floor_id)
+            if floor_ids is not None:
+                query = query.in_("floor_id", floor_ids)
+            return query
+
+        objects = page_response(await fetch_page("Objects", page, where), response)
 
-        return objects.data
+        # Legacy clients can ask for one row per covered cell
+        if expand == "cells":
+            objects = expand_cells(objects)
+        return fast_json(objects, response)
+    except HTTPException as http_err:
+        raise http_err
     except Exception as e:
         raise HTTPException(status_code=500, detail=f"Supabase query failed: {str(e)}")
 
@@ -39,17 +60,28 @@ async def fetch_objects(floor_id: int = None, building_id: int = None):
 @router.post("/create-object/")
 async def create_object(object: ObjectModel):
     try:
-        new_object = supabase.table("Objects").insert(object.dict()).execute()
+        index = await spatial.get_floor_index(object.floor_id)
+        error = index.check_object_placement(object.x_coor, object.y_coor, object.width, object.length, object.o_type)
+        if error:
+            raise HTTPException(status_code=409, detail=error)
+
+        new_object = await execute(table("Objects").insert(object.dict()))
+        spatial.object_saved(new_object.data[0])
+        await cache.invalidate(f"objects:floor:{object.floor_id}")
         return new_object.data[0]
+    except HTTPException as http_err:
+        raise http_err
     except Exception as e:
         raise HTTPException(status_code=500, detail=f"Supabase query failed: {str(e)}")
 
 @router.delete("/delete-object/{object_id}")
 async def delete_object(object_id: int):
     try:
-        object = supabase.table("Objects").delete().eq("id", object_id).execute()
+        object = await execute(table("Objects").delete().eq("id", object_id))
         if not object.data:
             raise HTTPException(status_code=404, detail="object not found")
+        spatial.object_deleted(object.data[0])
+        await cache.invalidate(f"objects:floor:{object.data[0]['floor_id']}")
         return object.data[0]
     except Exception as e:
         raise HTTPException(status_code=500, detail=f"Supabase query failed: {str(e)}")
@@ -57,10 +89,26 @@ async def delete_object(object_id: int):
 @router.put("/update-object/{object_id}")
 async def update_object(object_id: int, object: ObjectModel):
     try:
-        updated_object = supabase.table("Objects").update(object.dict()).eq("id", object_id).execute()
+        fields = object.dict(exclude_unset=True)
+        index = await spatial.get_floor_index(object.floor_id)
+
+        # Keep the current extent unless the client sent a new one
+        current = index.objects.get(object_id, {})
+        width = fields.get("width", current.get("width", 1))
+        length = fields.get("length", current.get("length", 1))
+        error = index.check_object_placement(object.x_coor, object.y_coor, width, length, object.o_type, ignore_object=object_id)
+        if error:
+            raise HTTPException(status_code=409, detail=error)
+
+        updated_object = await execute(table("Objects").update(fields).eq("id", object_id))
         if not updated_object.data:
             raise HTTPException(status_code=404, detail="object not found")
+        spatial.object_saved(updated_object.data[0])
+        # The object may have moved to another floor
+        await cache.invalidate_prefix("objects:floor:")
         return updated_object.data[0]
+    except HTTPException as http_err:
+        raise http_err
     except Exception as e:
         raise HTTPException(status_code=500, detail=f"Supabase query failed: {str(e)}")
 
@@ -80,42 +128,68 @@ async def create_item(request: CreateItemRequest):
 async def update_item_coordinates(item: UpdateItemCoordinatesRequest):
     try:
         # Query the "Objects" table to find the item by id
-        object = supabase.table("Objects").select('*').eq("id", item.item_id).execute()
+        object = await execute(table("Objects").select('*').eq("id", item.item_id))
         
         if not object.data:
             raise HTTPException(status_code=404, detail="Item not found")
+        current = object.data[0]
+
+        index = await spatial.get_floor_index(current["floor_id"])
+        error = index.check_object_placement(
+            item.x_coor, item.y_coor, current.get("width", 1), current.get("length", 1), current["o_type"],
+            ignore_object=item.item_id
+        )
+        if error:
+            raise HTTPException(status_code=409, detail=error)
         
         # Update the coordinates of the found object
-        updated_object = supabase.table("Objects").update({
+        updated_object = await execute(table("Objects").update({
             "x_coor": item.x_coor,
             "y_coor": item.y_coor
-        }).eq("id", item.item_id).execute()
+        }).eq("id", item.item_id))
+        if updated_object.data:
+            spatial.object_saved(updated_object.data[0])
+        await cache.invalidate(f"objects:floor:{current['floor_id']}")
 
         return {"message": "Item coordinates updated successfully!"}
 
+    except HTTPException as http_err:
+        raise http_err
     except Exception as e:
-        print(f"Error occurred: {str(e)}")  # Log the error for debugging
+        logging.error(f"Error in update_item_coordinates: {str(e)}")
         raise HTTPException(status_code=500, detail=f"Supabase query failed: {str(e)}")
 
 @router.get("/fetch-placed-objects/{floor_id}")
-async def fetch_placed_objects(floor_id: int):
+async def fetch_placed_objects(floor_id: int, request: Request, response: Response, expand: Optional[str] = None):
     try:
-        objects = supabase.table("Objects").select('*').eq("floor_id", floor_id).execute()
-        return objects.data if objects.data else []
+        # With the floor index loaded, its version validates the layout without reading it
+        index = spatial.loaded_floor_index(floor_id)
+        if index is not None:
+            etag = version_etag("objects", floor_id, EPOCH, index.loaded_at, index.version, expand)
+            cached = not_modified(request, etag, response)
+            if cached is not None:
+                return cached
+            response.headers["ETag"] = etag
+
+        objects = await fetch_floor_objects(floor_id)
+        if expand == "cells":
+            objects = expand_cells(objects)
+        return fast_json(objects, response)
     except Exception as e:
         raise HTTPException(status_code=500, detail=f"Supabase query failed: {str(e)}")
     
 @router.put("/update-object/{object_id}")
 async def update_object(object_id: int, object: UpdateObjectModel):
     try:
-        updated_object = (
-            supabase.table("Objects")
+        updated_object = await execute(
+            table("Objects")
             .update(object.dict(exclude_unset=True))  # Update only provided fields
             .eq("id", object_id)
-            .execute()
         )
         if not updated_object.data:
             raise HTTPException(status_code=404, detail="Object not found")
+        spatial.object_saved(updated_object.data[0])
+        await cache.invalidate_prefix("objects:floor:")
         return updated_object.data[0]
     except Exception as e:
         raise HTTPException(status_code=500, detail=f"Supabase query failed: {str(e)}")
@@ -123,33 +197,135 @@ async def update_object(object_id: int, object: UpdateObjectModel):
 @router.post("/create-or-update-object/")
 async def create_or_update_object(object: ObjectModel):
     try:
-        # Check if object already exists for the given floor and coordinates
-        existing_object = (
-            supabase.table("Objects")
-            .select('*')
-            .eq("floor_id", object.floor_id)
-            .eq("x_coor", object.x_coor)
-            .eq("y_coor", object.y_coor)
-            .execute()
-        )
+        # Only the object anchored (top-left cell) here is replaced; one merely covering the cell is a conflict
+        index = await spatial.get_floor_index(object.floor_id)
+        existing_object = index.object_at(object.x_coor, object.y_coor)
+        if existing_object and (existing_object["x_coor"], existing_object["y_coor"]) != (object.x_coor, object.y_coor):
+            raise HTTPException(status_code=409, detail="Area is already occupied by another object")
+        existing_id = existing_object["id"] if existing_object else None
+
+        fields = object.dict(exclude_unset=True)
+        width = fields.get("width", existing_object.get("width", 1) if existing_object else 1)
+        length = fields.get("length", existing_object.get("length", 1) if existing_object else 1)
+        error = index.check_object_placement(object.x_coor, object.y_coor, width, length, object.o_type, ignore_object=existing_id)
+        if error:
+            raise HTTPException(status_code=409, detail=error)
 
         # If object exists, update it
-        if existing_object.data:
-            updated_object = (
-                supabase.table("Objects")
-                .update(object.dict(exclude_none=True))
-                .eq("id", existing_object.data[0]["id"])
-                .execute()
+        if existing_object:
+            updated_object = await execute(
+                table("Objects")
+                .update(fields)
+                .eq("id", existing_id)
             )
+            spatial.object_saved(updated_object.data[0])
+            await cache.invalidate(f"objects:floor:{object.floor_id}")
             return {"message": "Object updated successfully!", "data": updated_object.data[0]}
 
         # Otherwise, create a new object
-        new_object = (
-            supabase.table("Objects")
+        new_object = await execute(
+            table("Objects")
             .insert(object.dict())
-            .execute()
         )
+        spatial.object_saved(new_object.data[0])
+        await cache.invalidate(f"objects:floor:{object.floor_id}")
         return {"message": "Object created successfully!", "data": new_object.data[0]}
 
+    except HTTPException as http_err:
+        raise http_err
     except Exception as e:
-        raise HTTPException(status_code=500, detail=f"Supabase query failed: {str(e)}")
\ No newline at end of file
+        raise HTTPException(status_code=500, detail=f"Supabase query failed: {str(e)}")
+
+PLACEMENT_JOB_CHUNK = 500  # Rows per upsert when placements run as a job, so progress can be reported
+
+async def apply_object_placements(floor_id: int, placements: List[ObjectPlacement], job: Optional[Job] = None) -> dict:
+    """
+    Validate a batch of placements on one floor together and write the valid ones
+    with a single upsert on (floor_id, x_coor, y_coor). Returns one result per
+    placement, in request order, and the written rows.
+
+    A placement replaces the object whose top-left cell is at its (x_coor, y_coor),
+    like create-or-update-object. It fails if it appears twice in the batch, doesn't
+    fit on the floor, overlaps an earlier placement of the batch or an object that
+    isn't replaced in the same batch, or covers seated personnel (non-desks only).
+    """
+    index = await spatial.get_floor_index(floor_id)
+    errors = {}  # position in the batch -> reason
+
+    seen, replaces = set(), {}
+    for i, p in enumerate(placements):
+        anchor = (p.x_coor, p.y_coor)
+        if anchor in seen:
+            errors[i] = "Placement appears more than once in this batch"
+            continue
+        seen.add(anchor)
+        existing = index.object_at(p.x_coor, p.y_coor)
+        if existing is not None and (existing["x_coor"], existing["y_coor"]) == anchor:
+            replaces[i] = existing["id"]
+
+    # Validate until stable: a replaced object only frees its cells if its replacement is accepted
+    while True:
+        moving = {object_id for i, object_id in replaces.items() if i not in errors}
+        claimed = set()
+        rejected = False
+        for i, p in enumerate(placements):
+            if i in errors:
+                continue
+            cells = [(p.x_coor + dx, p.y_coor + dy) for dx in range(p.width) for dy in range(p.length)]
+            if p.width < 1 or p.length < 1:
+                errors[i] = "Object width and length must be at least 1"
+            elif not index.in_bounds(p.x_coor, p.y_coor, p.width, p.length):
+                errors[i] = "Object does not fit on the floor"
+            elif any(index.cells.get(cell, None) not in (None, *moving) for cell in cells):
+                errors[i] = "Area is already occupied by another object"
+            elif any(cell in claimed for cell in cells):
+                errors[i] = "Area overlaps another placement in this batch"
+            elif p.o_type != spatial.WORKSPACE_TYPE and any(cell in index.seats for cell in cells):
+                errors[i] = "Area is occupied by personnel"
+            else:
+                claimed.update(cells)
+                continue
+            rejected = True
+        if not rejected:
+            break
+
+    valid = [{"floor_id": floor_id, **p.dict()} for i, p in enumerate(placements) if i not in errors]
+    written = {}
+    chunk = PLACEMENT_JOB_CHUNK if job is not None else max(1, len(valid))
+    for start in range(0, len(valid), chunk):
+        result = await execute(table("Objects").upsert(valid[start:start + chunk], on_conflict="floor_id,x_coor,y_coor"))
+        for row in result.data:
+            spatial.object_saved(row)
+            written[(row["x_coor"], row["y_coor"])] = row
+        if job is not None:
+            job.report(start + len(result.data), len(valid))
+    if valid:
+        await cache.invalidate(f"objects:floor:{floor_id}")
+
+    results = []
+    for i, p in enumerate(placements):
+        row = written.get((p.x_coor, p.y_coor))
+        if i in errors or row is None:
+            results.append({"x_coor": p.x_coor, "y_coor": p.y_coor, "status": "error",
+                            "detail": errors.get(i, "Object was not written")})
+        else:
+            results.append({"x_coor": p.x_coor, "y_coor": p.y_coor, "id": row["id"],
+                            "status": "updated" if i in replaces else "created"})
+    return {"applied": len(written), "results": results, "data": list(written.values())}
+
+@router.post("/create-or-update-objects/{floor_id}")
+async def create_or_update_objects(floor_id: int, request: BulkObjectPlacementRequest, background: bool = False):
+    """
+    Apply a batch of placements (see apply_object_placements). With
+    ?background=true the batch runs as a job: 202 now, result at /jobs/{id}.
+    """
+    try:
+        if not request.placements:
+            raise HTTPException(status_code=400, detail="No placements provided")
+        if background:
+            return accepted(jobs.submit("create-or-update-objects", apply_object_placements, floor_id, request.placements))
+        return await apply_object_placements(floor_id, request.placements)
+    except HTTPException as http_err:
+        raise http_err
+    except Exception as e:
+        raise HTTPException(status_code=500, detail=f"Supabase query failed: {str(e)}")
@@ -1,7 +1,16 @@
-from fastapi import APIRouter, HTTPException
-from app.database import supabase
-from app.models import PersonnelModel
+from fastapi import APIRouter, Depends, HTTPException, Response
+from app.database import table, rpc, execute
+from app.models import PersonnelModel, SeatAssignment, BulkSeatAssignmentRequest, SeatingPlanRequest, LoginRequest
+from app.auth import hash_password, verify_password, is_hashed, without_password, create_token, current_claims
+from app.config import TOKEN_TTL, ASSIGN_SEATS_RPC
+from app import spatial
+from app.pagination import PageParams, fetch_page, page_response, iter_rows, select_list
+from app.seating import plan_seating
 from pydantic import BaseModel
+from typing import List, Optional
+import asyncio
+import logging
+import time
 
 router = APIRouter()
 
@@ -11,11 +20,20 @@ class UpdateCoordinatesRequest(BaseModel):
     x_coor: int
     y_coor: int
 
+async def check_seat(floor_id, x_coor, y_coor, personnel_id=None):
+    """Reject seating personnel outside the floor, on furniture or on someone else's seat."""
+    if floor_id is None or x_coor is None or y_coor is None:
+        return
+    index = await spatial.get_floor_index(floor_id)
+    error = index.check_seat(x_coor, y_coor, personnel_id)
+    if error:
+        raise HTTPException(status_code=409, detail=error)
+
 # Fetch Personnel (existing)
 @router.get("/fetch-personnel/{personnel_id}")
 async def fetch_personnel(personnel_id: int):
     try:
-        personnel = supabase.table("Personnels").select('*').eq("id", personnel_id).execute()
+        personnel = await execute(table("Personnels").select(select_list("Personnels", None)).eq("id", personnel_id))
         if not personnel.data:
             raise HTTPException(status_code=404, detail="Personnel not found")
         return personnel.data[0]
@@ -23,16 +41,16 @@ async def fetch_personnel(personnel_id: int):
         raise HTTPException(status_code=500, detail=f"Supabase query failed: {str(e)}")
 
 @router.get("/fetch-unplaced-users")
-async def fetch_unplaced_users():
+async def fetch_unplaced_users(response: Response, page: PageParams = Depends()):
     try:
-        # Fetch unplaced users
-        personnel = supabase.table("Personnels").select('*').is_('x_coor', None).is_('y_coor', None).execute()
-        
-        # If no unplaced users, return an empty list
-        if not personnel.data:
-            return []  # Return an empty array instead of raising an exception
-        
-        return personnel.data
+        # Fetch unplaced users; an empty page is returned as an empty array
+        personnel = await fetch_page(
+            "Personnels", page,
+            lambda query: query.is_('x_coor', None).is_('y_coor', None)
+        )
+        return page_response(personnel, response)
+    except HTTPException as http_err:
+        raise http_err
     except Exception as e:
         raise HTTPException(status_code=500, detail=f"Supabase query failed: {str(e)}")
 
@@ -41,8 +59,14 @@ async def fetch_unplaced_users():
 @router.post("/create-personnel")
 async def create_personnel(personnel: PersonnelModel):
     try:
-        new_personnel = supabase.table("Personnels").insert(personnel.dict()).execute()
-        return new_personnel.data[0]
+        await check_seat(personnel.floor_id, personnel.x_coor, personnel.y_coor)
+        row = {**personnel.dict(), "password": await stored_password(personnel.password)}
+        new_personnel = await execute(table("Personnels").insert(row))
+        created = new_personnel.data[0]
+        spatial.personnel_moved(created["id"], created.get("floor_id"), created.get("x_coor"), created.get("y_coor"))
+        return without_password(created)
+    except HTTPException as http_err:
+        raise http_err
     except Exception as e:
         raise HTTPException(status_code=500, detail=f"Supabase query failed: {str(e)}")
 
@@ -50,10 +74,11 @@ async def create_personnel(personnel: PersonnelModel):
 @router.delete("/delete-personnel/{personnel_id}")
 async def delete_personnel(personnel_id: int):
     try:
-        personnel = supabase.table("Personnels").delete().eq("id", personnel_id).execute()
+        personnel = await execute(table("Personnels").delete().eq("id", personnel_id))
         if not personnel.data:
             raise HTTPException(status_code=404, detail="Personnel not found")
-        return personnel.data[0]
+        spatial.personnel_moved(personnel_id, None, None, None)
+        return without_password(personnel.data[0])
     except Exception as e:
         raise HTTPException(status_code=500, detail=f"Supabase query failed: {str(e)}")
 
@@ -61,71 +86,272 @@ async def delete_personnel(personnel_id: int):
 @router.put("/update-personnel/{personnel_id}")
 async def update_personnel(personnel_id: int, personnel: PersonnelModel):
     try:
-        updated_personnel = supabase.table("Personnels").update(personnel.dict()).eq("id", personnel_id).execute()
+        await check_seat(personnel.floor_id, personnel.x_coor, personnel.y_coor, personnel_id)
+        row = {**personnel.dict(), "password": await stored_password(personnel.password)}
+        updated_personnel = await execute(table("Personnels").update(row).eq("id", personnel_id))
         if not updated_personnel.data:
             raise HTTPException(status_code=404, detail="Personnel not found")
-        return updated_personnel.data[0]
+        spatial.personnel_moved(personnel_id, personnel.floor_id, personnel.x_coor, personnel.y_coor)
+        return without_password(updated_personnel.data[0])
+    except HTTPException as http_err:
+        raise http_err
     except Exception as e:
         raise HTTPException(status_code=500, detail=f"Supabase query failed: {str(e)}")
 
-# Authorize Personnel (existing)
+async def _off_loop(fn, *args):
+    # Hashing is deliberately slow, so it runs on the default thread pool (asyncio.to_thread needs 3.9)
+    return await asyncio.get_running_loop().run_in_executor(None, fn, *args)
+
+async def stored_password(password: str) -> str:
+    """Hash a password for storage. Clients can't set a raw hash."""
+    if is_hashed(password):
+        raise HTTPException(status_code=400, detail="Password must be sent in plain text, not as a stored hash")
+    return await _off_loop(hash_password, password)
+
+async def check_credentials(email: str, password: str) -> Optional[dict]:
+    """The personnel row matching email and password, or None. Plain-text passwords are upgraded to a hash."""
+    personnel = await execute(table("Personnels").select('*').eq("email", email))
+    for row in personnel.data:
+        if await _off_loop(verify_password, password, row.get("password")):
+            if not is_hashed(row.get("password")):
+                hashed = await _off_loop(hash_password, password)
+                await execute(table("Personnels").update({"password": hashed}).eq("id", row["id"]))
+            return row
+    return None
+
+# Authorize Personnel (existing; prefer /login-personnel, which keeps the password out of the URL)
 @router.get("/authorize-personnel/{email}/{password}")
 async def authorize_personnel(email: str, password: str):
     try:
-        personnel = supabase.table("Personnels").select('*').eq("email", email).eq("password", password).execute()
-        if not personnel.data:
+        personnel = await check_credentials(email, password)
+        if personnel is None:
             raise HTTPException(status_code=404, detail="Personnel not found")
-        return personnel.data[0]
+        return without_password(personnel)
+    except HTTPException as http_err:
+        raise http_err
+    except Exception as e:
+        raise HTTPException(status_code=500, detail=f"Supabase query failed: {str(e)}")
+
+@router.post("/login-personnel")
+async def login_personnel(credentials: LoginRequest):
+    """Check the credentials once and return a bearer token for the authenticated endpoints."""
+    try:
+        personnel = await check_credentials(credentials.email, credentials.password)
+        if personnel is None:
+            raise HTTPException(status_code=401, detail="Invalid email or password")
+        return {
+            "access_token": create_token(personnel),
+            "token_type": "bearer",
+            "expires_in": TOKEN_TTL,
+            "personnel": without_password(personnel),
+        }
+    except HTTPException as http_err:
+        raise http_err
     except Exception as e:
         raise HTTPException(status_code=500, detail=f"Supabase query failed: {str(e)}")
 
+@router.get("/fetch-current-personnel")
+async def fetch_current_personnel(claims: dict = Depends(current_claims)):
+    """Who the bearer token belongs to, answered from the token alone."""
+    return claims
+
 # Update Personnel Coordinates (Modified to use Supabase)
 @router.post("/update-personnel-coordinates/")
 async def update_personnel_coordinates_endpoint(request: UpdateCoordinatesRequest):
     try:
+        await check_seat(request.floor_id, request.x_coor, request.y_coor, request.personnel_id)
+
         # Update the personnel's coordinates using Supabase
-        updated_personnel = supabase.table("Personnels").update({
+        updated_personnel = await execute(table("Personnels").update({
             "floor_id": request.floor_id,
             "x_coor": request.x_coor,
             "y_coor": request.y_coor
-        }).eq("id", request.personnel_id).execute()
+        }).eq("id", request.personnel_id))
 
         if not updated_personnel.data:
             raise HTTPException(status_code=404, detail="Personnel not found")
+        spatial.personnel_moved(request.personnel_id, request.floor_id, request.x_coor, request.y_coor)
         
         return {"message": "Coordinates updated successfully"}
     
+    except HTTPException as http_err:
+        raise http_err
     except Exception as e:
         raise HTTPException(status_code=500, detail=f"Supabase query failed: {str(e)}")
 
 @router.get("/fetch-staff-personnel/{floor_id}")
 async def fetch_staff_personnel(floor_id: int):
     try:
-        personnel = (
-            supabase.table("Personnels")
-            .select('*')
+        personnel = await execute(
+            table("Personnels")
+            .select(select_list("Personnels", None))
             .eq("floor_id", floor_id)
-            .execute()
         )
 
         return personnel.data if personnel.data else []
     except Exception as e:
-        print(f"Error fetching staff personnel: {e}")  # Debugging
+        logging.error(f"Error in fetch_staff_personnel: {str(e)}")
         raise HTTPException(status_code=500, detail=f"Supabase query failed: {str(e)}")
 
 @router.put("/update-personnel-coordinates-null/{personnel_id}")
 async def update_personnel_coordinates_null(personnel_id: int):
     try:
         # Set x_coor, y_coor, and floor_id to null
-        updated_personnel = supabase.table("Personnels").update({
+        updated_personnel = await execute(table("Personnels").update({
             "x_coor": None,
             "y_coor": None,
             "floor_id": None
-        }).eq("id", personnel_id).execute()
+        }).eq("id", personnel_id))
 
         if not updated_personnel.data:
             raise HTTPException(status_code=404, detail="Personnel not found")
+        spatial.personnel_moved(personnel_id, None, None, None)
         
         return {"message": "Personnel coordinates and floor_id set to null successfully!"}
     except Exception as e:
-        raise HTTPException(status_code=500, detail=f"Supabase query failed: {str(e)}")
\ No newline at end of file
+        raise HTTPException(status_code=500, detail=f"Supabase query failed: {str(e)}")
+
+async def apply_seat_assignments(assignments: List[SeatAssignment]) -> dict:
+    """
+    Validate a batch of seat assignments together and write the valid ones in a
+    single statement, so either all of them are stored or none is. Only floor_id
+    and the coordinates are written, so concurrent edits to other columns survive.
+    Returns one result per assignment, in request order.
+
+    An assignment fails if its personnel or floor doesn't exist, if it appears
+    twice in the batch (same personnel or same seat), or if the seat is outside
+    the floor, under furniture, or taken by someone who isn't moving away in the
+    same batch.
+    """
+    errors = {}  # position in the batch -> reason
+
+    # Duplicates inside the batch: the first claim on a personnel or seat wins
+    seen_personnel, seen_seats = set(), set()
+    for i, a in enumerate(assignments):
+        seat = (a.floor_id, a.x_coor, a.y_coor)
+        if a.personnel_id in seen_personnel:
+            errors[i] = "Personnel is assigned more than once in this batch"
+        elif seat in seen_seats:
+            errors[i] = "Seat is assigned more than once in this batch"
+        seen_personnel.add(a.personnel_id)
+        seen_seats.add(seat)
+
+    # One query for which personnel exist, one index per floor (usually cached)
+    personnel_ids = list({a.personnel_id for a in assignments})
+    existing = await execute(table("Personnels").select("id").in_("id", personnel_ids))
+    found = {row["id"] for row in existing.data}
+
+    floor_ids = list({a.floor_id for a in assignments})
+    loaded = await asyncio.gather(*(spatial.get_floor_index(f) for f in floor_ids), return_exceptions=True)
+    indexes = {f: index for f, index in zip(floor_ids, loaded) if isinstance(index, spatial.FloorIndex)}
+
+    # Seats taken by someone else are fine if that person moves in this batch
+    occupants = {}
+    for i, a in enumerate(assignments):
+        if i in errors:
+            continue
+        if a.personnel_id not in found:
+            errors[i] = "Personnel not found"
+            continue
+        index = indexes.get(a.floor_id)
+        if index is None:
+            errors[i] = "Floor not found"
+            continue
+        occupant = index.personnel_at(a.x_coor, a.y_coor)
+        error = index.check_seat(a.x_coor, a.y_coor, occupant if occupant is not None else a.personnel_id)
+        if error:
+            errors[i] = error
+        elif occupant is not None and occupant != a.personnel_id:
+            occupants[i] = occupant
+
+    # Reject until stable: a seat is only freed if its occupant's own move succeeds
+    moving = {a.personnel_id for i, a in enumerate(assignments) if i not in errors}
+    changed = True
+    while changed:
+        changed = False
+        for i, occupant in occupants.items():
+            if i not in errors and occupant not in moving:
+                errors[i] = "Seat is already taken"
+                moving.discard(assignments[i].personnel_id)
+                changed = True
+
+    accepted = [a for i, a in enumerate(assignments) if i not in errors]
+    seats = [{"id": a.personnel_id, "floor_id": a.floor_id, "x_coor": a.x_coor, "y_coor": a.y_coor} for a in accepted]
+    updated = set()
+    if ASSIGN_SEATS_RPC and seats:
+        result = await execute(rpc("assign_seats", {"assignments": seats}))
+        updated = {row["id"] for row in result.data}
+    elif seats:
+        # One statement for the whole batch; only the seat columns are in the payload,
+        # so only they are overwritten on the rows checked to exist above
+        result = await execute(table("Personnels").upsert(seats, on_conflict="id"))
+        updated = {row["id"] for row in result.data}
+    for i, a in enumerate(assignments):
+        if i not in errors and a.personnel_id not in updated:
+            errors[i] = "Personnel not found"
+        elif i not in errors:
+            spatial.personnel_moved(a.personnel_id, a.floor_id, a.x_coor, a.y_coor)
+
+    return {
+        "applied": len(updated),
+        "results": [
+            {"personnel_id": a.personnel_id, "status": "error", "detail": errors[i]} if i in errors
+            else {"personnel_id": a.personnel_id, "status": "ok"}
+            for i, a in enumerate(assignments)
+        ],
+    }
+
+@router.post("/assign-seats/")
+async def assign_seats(request: BulkSeatAssignmentRequest):
+    try:
+        if not request.assignments:
+            raise HTTPException(status_code=400, detail="No assignments provided")
+        return await apply_seat_assignments(request.assignments)
+    except HTTPException as http_err:
+        raise http_err
+    except Exception as e:
+        raise HTTPException(status_code=500, detail=f"Supabase query failed: {str(e)}")
+
+@router.post("/plan-seating/{floor_id}")
+async def plan_floor_seating(floor_id: int, request: SeatingPlanRequest):
+    """
+    Propose desks on a floor for unplaced personnel. The plan uses the shape of
+    /assign-seats/ and is applied through it when commit is true.
+    """
+    try:
+        started = time.perf_counter()
+        index = await spatial.get_floor_index(floor_id)
+        desks = [cell for bucket in index.desk_buckets.values() for cell in bucket if cell not in index.seats]
+
+        unplaced = [
+            p["id"] async for p in iter_rows(
+                "Personnels", "id", lambda query: query.is_('x_coor', None).is_('y_coor', None)
+            )
+        ]
+        if request.personnel_ids is not None:
+            wanted = set(request.personnel_ids)
+            unplaced = [p for p in unplaced if p in wanted]
+
+        try:
+            plan = plan_seating(desks, unplaced, request.teams, request.strategy)
+        except ValueError as e:
+            raise HTTPException(status_code=400, detail=str(e))
+
+        assignments = [
+            SeatAssignment(personnel_id=p, floor_id=floor_id, x_coor=x, y_coor=y) for p, (x, y) in plan
+        ]
+        placed = {a.personnel_id for a in assignments}
+        result = {
+            "floor_id": floor_id,
+            "assignments": [a.dict() for a in assignments],
+            "unassigned": [p for p in unplaced if p not in placed],
+            "freeDesks": len(desks),
+            "elapsedMs": round((time.perf_counter() - started) * 1000, 2),
+        }
+        if request.commit and assignments:
+            result["commit"] = await apply_seat_assignments(assignments)
+        return result
+    except HTTPException as http_err:
+        raise http_err
+    except Exception as e:
+        raise HTTPException(status_code=500, detail=f"Supabase query failed: {str(e)}")
@@ -0,0 +1,189 @@
+# app/search.py
+"""
+In-process full-text index of Feedbacks for /search-feedbacks.
+
+An inverted index maps every word of a feedback's title and text to the
+feedbacks containing it, so a search only touches the postings of its query
+words instead of scanning the table. Matches must contain every query word
+(the last one may be a prefix, for search-as-you-type) and are ranked with
+BM25, counting title words twice.
+
+The index is loaded on first use, updated by the create/delete endpoints, and
+reloaded after FEEDBACK_INDEX_TTL seconds so feedback written through other
+workers shows up.
+"""
+import asyncio
+import bisect
+import heapq
+import math
+import re
+import time
+from typing import Optional
+from app.config import FEEDBACK_INDEX_TTL
+from app.pagination import iter_rows
+
+K1 = 1.2
+B = 0.75
+TITLE_WEIGHT = 2
+MAX_PREFIX_TERMS = 50  # Words a trailing prefix may expand to
+
+_WORD = re.compile(r"\w+")
+
+def tokenize(text: Optional[str]) -> list:
+    return _WORD.findall(text.casefold()) if text else []
+
+class FeedbackIndex:
+    def __init__(self):
+        self.rows = {}           # feedback id -> row
+        self.lengths = {}        # feedback id -> weighted word count
+        self.postings = {}       # word -> {feedback id: weighted frequency}
+        self.by_personnel = {}   # personnelId -> set of feedback ids
+        self.total_length = 0
+        self.loaded_at = None
+        self._terms = None       # Sorted vocabulary for prefix lookups, built on first use
+        self._lock = asyncio.Lock()
+        self._pending = None     # Writes made while a reload is reading, replayed after it
+
+    # Writes
+
+    def add(self, row: dict):
+        if self._pending is not None:
+            self._pending.append(("add", row))
+        self._unindex(row["id"])
+        freqs = {}
+        for word in tokenize(row.get("title")):
+            freqs[word] = freqs.get(word, 0) + TITLE_WEIGHT
+        for word in tokenize(row.get("feedback")):
+            freqs[word] = freqs.get(word, 0) + 1
+
+        self.rows[row["id"]] = row
+        self.lengths[row["id"]] = sum(freqs.values())
+        self.total_length += self.lengths[row["id"]]
+        for word, freq in freqs.items():
+            if word not in self.postings:
+                self.postings[word] = {}
+                if self._terms is not None:
+                    bisect.insort(self._terms, word)
+            self.postings[word][row["id"]] = freq
+        self.by_personnel.setdefault(row.get("personnelId"), set()).add(row["id"])
+
+    def remove(self, feedback_id: int):
+        if self._pending is not None:
+            self._pending.append(("remove", feedback_id))
+        self._unindex(feedback_id)
+
+    def _unindex(self, feedback_id: int):
+        row = self.rows.pop(feedback_id, None)
+        if row is None:
+            return
+        self.total_length -= self.lengths.pop(feedback_id)
+        for word in set(tokenize(row.get("title")) + tokenize(row.get("feedback"))):
+            docs = self.postings.get(word)
+            if docs is not None:
+                docs.pop(feedback_id, None)
+                if not docs:
+                    del self.postings[word]
+                    if self._terms is not None:
+                        del self._terms[bisect.bisect_left(self._terms, word)]
+        ids = self.by_personnel.get(row.get("personnelId"))
+        if ids is not None:
+            ids.discard(feedback_id)
+            if not ids:
+                del self.by_personnel[row.get("personnelId")]
+
+    async def ensure_loaded(self):
+        if self.loaded_at is not None and time.monotonic() - self.loaded_at < FEEDBACK_INDEX_TTL:
+            return
+        async with self._lock:
+            if self.loaded_at is not None and time.monotonic() - self.loaded_at < FEEDBACK_INDEX_TTL:
+                return
+            fresh = FeedbackIndex()
+            self._pending = []
+            try:
+                async for row in iter_rows("Feedbacks"):
+                    fresh.add(row)
+            finally:
+                pending, self._pending = self._pending, None
+            self.rows, self.lengths, self.postings = fresh.rows, fresh.lengths, fresh.postings
+            self.by_personnel, self.total_length = fresh.by_personnel, fresh.total_length
+            self._terms = None
+            self.loaded_at = time.monotonic()
+            for op, arg in pending:
+                if op == "add":
+                    self.add(arg)
+                else:
+                    self.remove(arg)
+
+    # Queries
+
+    def _expand_prefix(self, prefix: str) -> list:
+        if self._terms is None:
+            self._terms = sorted(self.postings)
+        start = bisect.bisect_left(self._terms, prefix)
+        words = []
+        for word in self._terms[start:start + MAX_PREFIX_TERMS]:
+            if not word.startswith(prefix):
+                break
+            words.append(word)
+        return words
+
+    def search(self, query: str, personnel_ids: Optional[set] = None, offset: int = 0, limit: int = 20) -> dict:
+        """
+        Feedbacks matching every word of `query` (all of them for an empty query),
+        optionally only those of `personnel_ids`, best first.
+        Returns {"total", "items": [row + "score"], "nextOffset"}.
+        """
+        words = tokenize(query)
+        allowed = None
+        if personnel_ids is not None:
+            allowed = set()
+            for personnel_id in personnel_ids:
+                allowed |= self.by_personnel.get(personnel_id, set())
+
+        if not words:
+            candidates = allowed if allowed is not None else self.rows.keys()
+            total = len(candidates)
+            top = heapq.nlargest(offset + limit, candidates)
+            items = [{**self.rows[i], "score": 0.0} for i in top[offset:]]
+            return {"total": total, "items": items, "nextOffset": offset + limit if offset + limit < total else None}
+
+        # One group of postings per query word; the last word also matches as a prefix
+        groups = [[word] for word in words[:-1]]
+        groups.append(sorted(set([words[-1]] + self._expand_prefix(words[-1]))))
+        group_postings = [[self.postings[w] for w in group if w in self.postings] for group in groups]
+        if not all(group_postings):
+            return {"total": 0, "items": [], "nextOffset": None}
+
+        # Intersect starting from the rarest word
+        order = sorted(group_postings, key=lambda ps: sum(len(p) for p in ps))
+        matches = allowed
+        for ps in order:
+            ids = ps[0].keys() if len(ps) == 1 else set().union(*ps)
+            matches = set(ids) if matches is None else ids & matches
+            if not matches:
+                return {"total": 0, "items": [], "nextOffset": None}
+
+        n = len(self.rows)
+        avg_length = self.total_length / n if n else 1.0
+        norms = {i: K1 * (1 - B + B * self.lengths[i] / avg_length) for i in matches}
+        scores = dict.fromkeys(matches, 0.0)
+        for ps in group_postings:
+            for postings in ps:
+                idf = math.log(1 + (n - len(postings) + 0.5) / (len(postings) + 0.5))
+                for i in (postings.keys() & matches if len(ps) > 1 else matches):
+                    freq = postings[i]
+                    scores[i] += idf * freq * (K1 + 1) / (freq + norms[i])
+
+        total = len(matches)
+        top = heapq.nlargest(offset + limit, scores.items(), key=lambda item: (item[1], item[0]))
+        items = [{**self.rows[i], "score": round(score, 4)} for i, score in top[offset:]]
+        return {"total": total, "items": items, "nextOffset": offset + limit if offset + limit < total else None}
+
+    def stats(self) -> dict:
+        return {
+            "feedbacks": len(self.rows),
+            "words": len(self.postings),
+            "ageSeconds": None if self.loaded_at is None else round(time.monotonic() - self.loaded_at, 1),
+        }
+
+feedback_index = FeedbackIndex()
@@ -0,0 +1,106 @@
+# app/seating.py
+"""
+Automatic seating: assign unplaced personnel to free desk cells of a floor.
+
+Desks are ordered along a Hilbert curve, which keeps cells that are close in
+the order close on the floor. Greedy placement then walks that order:
+
+  - "compact": fill desks in curve order, so people (and teams) sit together
+  - "spread":  take evenly spaced desks along the curve, so density is spread out
+
+When teams are given, people are grouped by team before placement, so each
+team lands on a contiguous stretch of the curve. A local search then swaps
+people of different teams between nearby seats while that brings members
+closer to their team's centroid.
+
+Everything is O(n log n) in the number of desks plus a bounded number of
+O(n * SWAP_WINDOW) improvement passes.
+"""
+from typing import Dict, List, Optional, Tuple
+
+SWAP_WINDOW = 8       # How far along the curve a swap partner may be
+MAX_SWAP_PASSES = 4
+
+Cell = Tuple[int, int]
+
+def hilbert_index(order: int, x: int, y: int) -> int:
+    """Position of (x, y) on a Hilbert curve filling a 2**order square."""
+    n = 1 << order
+    d = 0
+    s = n >> 1
+    while s > 0:
+        rx = 1 if x & s else 0
+        ry = 1 if y & s else 0
+        d += s * s * ((3 * rx) ^ ry)
+        # Rotate the quadrant so the curve stays continuous
+        if ry == 0:
+            if rx == 1:
+                x = n - 1 - x
+                y = n - 1 - y
+            x, y = y, x
+        s >>= 1
+    return d
+
+def curve_order(cells: List[Cell]) -> List[Cell]:
+    if not cells:
+        return []
+    size = max(max(x for x, _ in cells), max(y for _, y in cells)) + 1
+    order = max(1, (size - 1).bit_length())
+    return sorted(cells, key=lambda c: hilbert_index(order, c[0], c[1]))
+
+def plan_seating(desks: List[Cell], people: List[int], teams: Optional[Dict[int, str]] = None,
+                 strategy: str = "compact") -> List[Tuple[int, Cell]]:
+    """
+    Return (personnel_id, desk) pairs for as many people as there are free desks.
+    People are taken in the given order (largest teams first when teams are given).
+    """
+    if strategy not in ("compact", "spread"):
+        raise ValueError("strategy must be 'compact' or 'spread'")
+
+    ordered_desks = curve_order(desks)
+    if teams:
+        sizes = {}
+        for p in people:
+            sizes[teams.get(p)] = sizes.get(teams.get(p), 0) + 1
+        people = sorted(people, key=lambda p: (-sizes[teams.get(p)], str(teams.get(p))))
+    people = people[:len(ordered_desks)]
+    if not people:
+        return []
+
+    if strategy == "spread":
+        stride = len(ordered_desks) / len(people)
+        seats = [ordered_desks[int(i * stride)] for i in range(len(people))]
+    else:
+        seats = ordered_desks[:len(people)]
+
+    if teams:
+        _improve_team_cohesion(people, seats, teams)
+    return list(zip(people, seats))
+
+def _improve_team_cohesion(people: List[int], seats: List[Cell], teams: Dict[int, str]):
+    """Swap seats of nearby people from different teams while it lowers the total
+    squared distance of every person to their team centroid. Works in place."""
+    for _ in range(MAX_SWAP_PASSES):
+        centroids = {}
+        for p, (x, y) in zip(people, seats):
+            sx, sy, n = centroids.get(teams.get(p), (0, 0, 0))
+            centroids[teams.get(p)] = (sx + x, sy + y, n + 1)
+        centroids = {t: (sx / n, sy / n) for t, (sx, sy, n) in centroids.items()}
+
+        def cost(team, cell):
+            cx, cy = centroids[team]
+            return (cell[0] - cx) ** 2 + (cell[1] - cy) ** 2
+
+        swapped = False
+        for i in range(len(people)):
+            for j in range(i + 1, min(i + 1 + SWAP_WINDOW, len(people))):
+                ti, tj = teams.get(people[i]), teams.get(people[j])
+                if ti == tj:
+                    continue
+                before = cost(ti, seats[i]) + cost(tj, seats[j])
+                after = cost(ti, seats[j]) + cost(tj, seats[i])
+                if after < before - 1e-9:
+                    seats[i], seats[j] = seats[j], seats[i]
+                    swapped = True
+        if not swapped:
+            break
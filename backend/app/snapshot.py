@@ -0,0 +1,70 @@
+# app/snapshot.py
+"""
+Columnar (struct-of-arrays) snapshot of a whole building, for the 3D editor.
+
+Instead of one dict per row, each table becomes a dict of parallel arrays:
+
+  floors:    id, number, width, length
+  objects:   id, floor_idx, o_type, state, x, y, width, length
+  personnel: id, floor_idx, x, y, name
+
+floor_idx is the position of the row's floor in the floors arrays. Missing
+personnel coordinates are -1. With binary=True every numeric array is sent as
+base64 of a little-endian typed array (dtypes lists the type of each), which
+the browser can wrap in a TypedArray without parsing.
+"""
+import base64
+import numpy as np
+
+FLOOR_COLUMNS = {"id": "<i4", "number": "<i4", "width": "<i4", "length": "<i4"}
+OBJECT_COLUMNS = {"id": "<i4", "floor_idx": "<u2", "o_type": "<i4", "state": "<u1",
+                  "x": "<i4", "y": "<i4", "width": "<i4", "length": "<i4"}
+PERSONNEL_COLUMNS = {"id": "<i4", "floor_idx": "<u2", "x": "<i4", "y": "<i4"}
+
+def _encode(columns: dict, dtypes: dict, binary: bool) -> dict:
+    if not binary:
+        return columns
+    encoded = dict(columns)
+    for name, dtype in dtypes.items():
+        encoded[name] = base64.b64encode(np.asarray(columns[name], dtype=dtype).tobytes()).decode()
+    return encoded
+
+def build_snapshot(building_id: int, floors: list, objects: list, personnel: list, binary: bool = False) -> dict:
+    floors = sorted(floors, key=lambda f: (f.get("number") or 0, f["id"]))
+    floor_idx = {f["id"]: i for i, f in enumerate(floors)}
+
+    floor_columns = {
+        "id": [f["id"] for f in floors],
+        "number": [f.get("number") or 0 for f in floors],
+        "width": [f.get("width") or 0 for f in floors],
+        "length": [f.get("length") or 0 for f in floors],
+    }
+    object_columns = {
+        "id": [o["id"] for o in objects],
+        "floor_idx": [floor_idx[o["floor_id"]] for o in objects],
+        "o_type": [o["o_type"] for o in objects],
+        "state": [1 if o.get("state") else 0 for o in objects],
+        "x": [o["x_coor"] for o in objects],
+        "y": [o["y_coor"] for o in objects],
+        "width": [o.get("width") or 1 for o in objects],
+        "length": [o.get("length") or 1 for o in objects],
+    }
+    personnel_columns = {
+        "id": [p["id"] for p in personnel],
+        "floor_idx": [floor_idx[p["floor_id"]] for p in personnel],
+        "x": [-1 if p.get("x_coor") is None else p["x_coor"] for p in personnel],
+        "y": [-1 if p.get("y_coor") is None else p["y_coor"] for p in personnel],
+        "name": [f"{p.get('name') or ''} {p.get('surname') or ''}".strip() for p in personnel],
+    }
+
+    result = {
+        "building_id": building_id,
+        "encoding": "base64" if binary else "json",
+        "counts": {"floors": len(floors), "objects": len(objects), "personnel": len(personnel)},
+        "floors": _encode(floor_columns, FLOOR_COLUMNS, binary),
+        "objects": _encode(object_columns, OBJECT_COLUMNS, binary),
+        "personnel": _encode(personnel_columns, PERSONNEL_COLUMNS, binary),
+    }
+    if binary:
+        result["dtypes"] = {"floors": FLOOR_COLUMNS, "objects": OBJECT_COLUMNS, "personnel": PERSONNEL_COLUMNS}
+    return result
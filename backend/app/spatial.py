@@ -0,0 +1,263 @@
+# app/spatial.py
+"""
+In-memory occupancy index per floor.
+
+A FloorIndex maps every cell of a floor to the object covering it and the
+personnel seated on it, so collision checks, "what is at (x, y)" and
+"nearest free desk" are answered without a database round trip.
+
+Indexes are loaded lazily from Supabase on first use, kept up to date by the
+write endpoints through the object_saved / object_deleted / personnel_moved /
+floor_changed hooks, and reloaded after SPATIAL_INDEX_TTL seconds so writes made by other
+workers are picked up.
+"""
+import asyncio
+import time
+from typing import Optional
+from fastapi import HTTPException
+from app.config import SPATIAL_INDEX_TTL
+from app.database import table, execute
+from app.pagination import iter_rows
+from app.layout import object_cells
+
+WORKSPACE_TYPE = 5  # o_type of desks (workspaces) that personnel can sit at
+BUCKET_SIZE = 16    # Side of the square buckets used by nearest_free_desk
+
+class FloorIndex:
+    def __init__(self, floor_id: int, width: Optional[int] = None, length: Optional[int] = None):
+        self.floor_id = floor_id
+        self.width = width      # Cells along x
+        self.length = length    # Cells along y
+        self.loaded_at = time.monotonic()
+        self.version = 0        # Bumped by every change, for results derived from the index
+        self.objects = {}       # object id -> row
+        self.cells = {}         # (x, y) -> object id
+        self.personnel = {}     # personnel id -> (x, y)
+        self.seats = {}         # (x, y) -> personnel id
+        self.desk_buckets = {}  # (x // BUCKET_SIZE, y // BUCKET_SIZE) -> set of desk cells
+
+    # Writes
+
+    def add_object(self, row: dict):
+        self.remove_object(row["id"])
+        self.version += 1
+        self.objects[row["id"]] = row
+        for cell in object_cells(row):
+            self.cells[cell] = row["id"]
+            if row.get("o_type") == WORKSPACE_TYPE:
+                self.desk_buckets.setdefault(_bucket(cell), set()).add(cell)
+
+    def remove_object(self, object_id: int):
+        row = self.objects.pop(object_id, None)
+        if row is None:
+            return
+        self.version += 1
+        for cell in object_cells(row):
+            if self.cells.get(cell) == object_id:
+                del self.cells[cell]
+            bucket = self.desk_buckets.get(_bucket(cell))
+            if bucket is not None:
+                bucket.discard(cell)
+                if not bucket:
+                    del self.desk_buckets[_bucket(cell)]
+
+    def place_personnel(self, personnel_id: int, x: Optional[int], y: Optional[int]):
+        self.remove_personnel(personnel_id)
+        if x is None or y is None:
+            return
+        self.version += 1
+        self.personnel[personnel_id] = (x, y)
+        self.seats[(x, y)] = personnel_id
+
+    def remove_personnel(self, personnel_id: int):
+        cell = self.personnel.pop(personnel_id, None)
+        if cell is None:
+            return
+        self.version += 1
+        if self.seats.get(cell) == personnel_id:
+            del self.seats[cell]
+
+    # Queries
+
+    def object_at(self, x: int, y: int) -> Optional[dict]:
+        object_id = self.cells.get((x, y))
+        return self.objects[object_id] if object_id is not None else None
+
+    def personnel_at(self, x: int, y: int) -> Optional[int]:
+        return self.seats.get((x, y))
+
+    def in_bounds(self, x: int, y: int, width: int = 1, length: int = 1) -> bool:
+        if x < 0 or y < 0:
+            return False
+        if self.width is not None and x + width > self.width:
+            return False
+        if self.length is not None and y + length > self.length:
+            return False
+        return True
+
+    def is_free(self, x: int, y: int, width: int = 1, length: int = 1, ignore_object: Optional[int] = None) -> bool:
+        """True if no object other than ignore_object covers any cell of the rectangle."""
+        for dx in range(width):
+            for dy in range(length):
+                object_id = self.cells.get((x + dx, y + dy))
+                if object_id is not None and object_id != ignore_object:
+                    return False
+        return True
+
+    def nearest_free_desk(self, x: int, y: int) -> Optional[tuple]:
+        """Closest desk cell (Euclidean) nobody is seated on, or None."""
+        if not self.desk_buckets:
+            return None
+        bx, by = x // BUCKET_SIZE, y // BUCKET_SIZE
+        if self.width and self.length:
+            last_x, last_y = (self.width - 1) // BUCKET_SIZE, (self.length - 1) // BUCKET_SIZE
+            max_ring = max(abs(bx), abs(by), abs(last_x - bx), abs(last_y - by))
+        else:
+            max_ring = max(max(abs(kx - bx), abs(ky - by)) for kx, ky in self.desk_buckets)
+        best, best_distance = None, None
+        for ring in range(max_ring + 1):
+            # Every cell in this ring is at least this far away along one axis
+            if best is not None and ((ring - 1) * BUCKET_SIZE + 1) ** 2 > best_distance:
+                break
+            for key in _ring(bx, by, ring):
+                for cell in self.desk_buckets.get(key, ()):
+                    if cell in self.seats:
+                        continue
+                    distance = (cell[0] - x) ** 2 + (cell[1] - y) ** 2
+                    if best is None or (distance, cell) < (best_distance, best):
+                        best, best_distance = cell, distance
+        return best
+
+    # Validation for the placement endpoints
+
+    def check_object_placement(self, x: int, y: int, width: int, length: int, o_type: int,
+                               ignore_object: Optional[int] = None) -> Optional[str]:
+        """Return why an object can't be placed there, or None if it can."""
+        if width < 1 or length < 1:
+            return "Object width and length must be at least 1"
+        if not self.in_bounds(x, y, width, length):
+            return "Object does not fit on the floor"
+        if not self.is_free(x, y, width, length, ignore_object):
+            return "Area is already occupied by another object"
+        if o_type != WORKSPACE_TYPE:
+            for dx in range(width):
+                for dy in range(length):
+                    if (x + dx, y + dy) in self.seats:
+                        return "Area is occupied by personnel"
+        return None
+
+    def check_seat(self, x: int, y: int, personnel_id: Optional[int] = None) -> Optional[str]:
+        """Return why personnel can't be seated there, or None if they can."""
+        if not self.in_bounds(x, y):
+            return "Coordinates are outside the floor"
+        seated = self.seats.get((x, y))
+        if seated is not None and seated != personnel_id:
+            return "Seat is already taken"
+        obj = self.object_at(x, y)
+        if obj is not None and obj.get("o_type") != WORKSPACE_TYPE:
+            return "Cell is occupied by an object"
+        return None
+
+def _bucket(cell: tuple) -> tuple:
+    return cell[0] // BUCKET_SIZE, cell[1] // BUCKET_SIZE
+
+def _ring(bx: int, by: int, ring: int):
+    """Bucket keys at Chebyshev distance `ring` from (bx, by)."""
+    if ring == 0:
+        yield bx, by
+        return
+    for kx in range(bx - ring, bx + ring + 1):
+        yield kx, by - ring
+        yield kx, by + ring
+    for ky in range(by - ring + 1, by + ring):
+        yield bx - ring, ky
+        yield bx + ring, ky
+
+# Loaded indexes, by floor id
+_indexes = {}
+_locks = {}
+
+def loaded_floor_index(floor_id: int) -> Optional[FloorIndex]:
+    """The index of a floor if it is loaded and fresh, without loading it."""
+    index = _indexes.get(floor_id)
+    if index is not None and time.monotonic() - index.loaded_at < SPATIAL_INDEX_TTL:
+        return index
+    return None
+
+async def _collect(rows) -> list:
+    return [row async for row in rows]
+
+async def get_floor_index(floor_id: int) -> FloorIndex:
+    """Return the index of a floor, loading it from Supabase if missing or stale."""
+    index = _indexes.get(floor_id)
+    if index is not None and time.monotonic() - index.loaded_at < SPATIAL_INDEX_TTL:
+        return index
+
+    async with _locks.setdefault(floor_id, asyncio.Lock()):
+        index = _indexes.get(floor_id)
+        if index is not None and time.monotonic() - index.loaded_at < SPATIAL_INDEX_TTL:
+            return index
+
+        # Paged, so floors above the API's row limit aren't silently truncated
+        on_floor = lambda query: query.eq("floor_id", floor_id)
+        floor, objects, personnel = await asyncio.gather(
+            execute(table("Floors").select("width, length").eq("id", floor_id)),
+            _collect(iter_rows("Objects", None, on_floor)),
+            _collect(iter_rows("Personnels", "id,x_coor,y_coor", on_floor)),
+        )
+        if not floor.data:
+            raise HTTPException(status_code=404, detail="Floor not found")
+
+        index = FloorIndex(floor_id, floor.data[0].get("width"), floor.data[0].get("length"))
+        for row in objects:
+            index.add_object(row)
+        for p in personnel:
+            index.place_personnel(p["id"], p.get("x_coor"), p.get("y_coor"))
+        _indexes[floor_id] = index
+        # The fresh rows may include writes made through other workers, which never
+        # reached this worker's listeners: deltas kept so far are incomplete
+        _notify(floor_id, {"type": "floor.reloaded"})
+        return index
+
+# Write hooks, called by the endpoints after a successful write. Floors that aren't
+# loaded are skipped; they load fresh when next used.
+#
+# Every change is also passed to change_listeners as listener(floor_id, change),
+# where change is a small delta such as {"type": "object.saved", "object": row}.
+# floor_id is None when personnel leave every floor (deleted or unassigned);
+# listeners that only track floors ignore those.
+change_listeners = []
+
+def _notify(floor_id: Optional[int], change: dict):
+    for listener in change_listeners:
+        listener(floor_id, change)
+
+def object_saved(row: dict):
+    for index in list(_indexes.values()):
+        if index.floor_id != row.get("floor_id") and row["id"] in index.objects:
+            # Moved to another floor
+            index.remove_object(row["id"])
+            _notify(index.floor_id, {"type": "object.deleted", "id": row["id"]})
+    index = _indexes.get(row.get("floor_id"))
+    if index is not None:
+        index.add_object(row)
+    _notify(row.get("floor_id"), {"type": "object.saved", "object": row})
+
+def object_deleted(row: dict):
+    for index in _indexes.values():
+        index.remove_object(row["id"])
+    _notify(row.get("floor_id"), {"type": "object.deleted", "id": row["id"]})
+
+def personnel_moved(personnel_id: int, floor_id: Optional[int], x: Optional[int], y: Optional[int]):
+    for index in list(_indexes.values()):
+        if index.floor_id == floor_id:
+            index.place_personnel(personnel_id, x, y)
+        elif personnel_id in index.personnel:
+            index.remove_personnel(personnel_id)
+            _notify(index.floor_id, {"type": "personnel.removed", "id": personnel_id})
+    _notify(floor_id, {"type": "personnel.moved", "id": personnel_id, "x_coor": x, "y_coor": y})
+
+def floor_changed(floor_id: int):
+    """Drop the index of a floor that was resized or deleted."""
+    _indexes.pop(floor_id, None)
+    _notify(floor_id, {"type": "floor.changed"})
@@ -0,0 +1,342 @@
+# app/storage.py
+"""
+Local storage engines that stand in for Supabase (STORAGE_BACKEND).
+
+The routers talk to the database only through app.database: table(name)
+returns a PostgREST-style query builder, and execute(query) runs it. The
+engines here implement that same builder interface, the subset the routers
+use, so every endpoint runs unchanged on:
+
+  - "supabase": the hosted database through supabase-py (default)
+  - "memory":   Python dicts with hash indexes on the foreign keys; fast and
+                deterministic, for tests, benchmarks and demos. Data is lost
+                on restart.
+  - "sqlite":   a SQLite file (STORAGE_PATH), for offline and edge deployments
+
+Supported: select / insert / upsert(on_conflict=) / update / delete,
+eq / neq / gt / gte / lt / lte / in_ / is_, order, limit and execute().
+Postgres functions (rpc) only exist on Supabase.
+"""
+import sqlite3
+import threading
+
+# Columns of every table, as created in SQLite; the memory engine is schemaless
+SCHEMA = {
+    "Admins": {"username": "TEXT UNIQUE", "password": "TEXT"},
+    "Buildings": {"floor_count": "INTEGER"},
+    "Floors": {"building_id": "INTEGER", "number": "INTEGER", "length": "INTEGER",
+               "width": "INTEGER", "capacity": "INTEGER"},
+    "Objects": {"state": "BOOLEAN", "floor_id": "INTEGER", "o_type": "INTEGER", "x_coor": "INTEGER",
+                "y_coor": "INTEGER", "width": "INTEGER DEFAULT 1", "length": "INTEGER DEFAULT 1"},
+    "Personnels": {"name": "TEXT", "surname": "TEXT", "email": "TEXT", "password": "TEXT",
+                   "floor_id": "INTEGER", "gender": "INTEGER", "x_coor": "INTEGER", "y_coor": "INTEGER"},
+    "Feedbacks": {"title": "TEXT", "personnelId": "INTEGER", "feedback": "TEXT"},
+}
+INDEXED = ("building_id", "floor_id", "personnelId")  # Foreign keys the routers filter on
+UNIQUE = {"Objects": ("floor_id", "x_coor", "y_coor")}  # Upsert targets besides id (sql/003_object_anchor_unique.sql)
+
+class StorageResponse:
+    def __init__(self, data: list):
+        self.data = data
+        self.count = len(data)
+
+class Query:
+    """Records a PostgREST-style query; the client's run() executes it."""
+
+    def __init__(self, client, table_name: str):
+        if table_name not in SCHEMA:
+            raise ValueError(f"Unknown table {table_name}")
+        self.client = client
+        self.table_name = table_name
+        self.path = "/" + table_name  # Same attributes as a PostgREST builder, for retries and metrics
+        self.http_method = "GET"
+        self.headers = {}
+        self.columns = "*"
+        self.payload = None
+        self.on_conflict = None
+        self.filters = []  # (op, column, value)
+        self.order_by = None
+        self.limit_to = None
+
+    def select(self, columns: str = "*", count=None):
+        self.columns = columns
+        return self
+
+    def insert(self, rows):
+        self.http_method = "POST"
+        self.payload = rows if isinstance(rows, list) else [rows]
+        return self
+
+    def upsert(self, rows, on_conflict: str = "id"):
+        self.insert(rows)
+        self.headers["Prefer"] = "resolution=merge-duplicates"
+        self.on_conflict = [c.strip() for c in on_conflict.split(",")]
+        return self
+
+    def update(self, fields: dict):
+        self.http_method = "PATCH"
+        self.payload = fields
+        return self
+
+    def delete(self):
+        self.http_method = "DELETE"
+        return self
+
+    def _filter(self, op: str, column: str, value):
+        self.filters.append((op, column, value))
+        return self
+
+    def eq(self, column, value): return self._filter("eq", column, value)
+    def neq(self, column, value): return self._filter("neq", column, value)
+    def gt(self, column, value): return self._filter("gt", column, value)
+    def gte(self, column, value): return self._filter("gte", column, value)
+    def lt(self, column, value): return self._filter("lt", column, value)
+    def lte(self, column, value): return self._filter("lte", column, value)
+    def in_(self, column, values): return self._filter("in", column, list(values))
+    def is_(self, column, value): return self._filter("is", column, None if value in (None, "null") else value)
+    def filter(self, column, operator, value): return self._filter(operator, column, value)
+
+    def order(self, column: str, desc: bool = False):
+        self.order_by = (column, desc)
+        return self
+
+    def limit(self, count: int):
+        self.limit_to = count
+        return self
+
+    def execute(self) -> StorageResponse:
+        return StorageResponse(self.client.run(self))
+
+def _columns(query: Query):
+    if query.columns.strip() == "*":
+        return None
+    return [c.strip() for c in query.columns.split(",") if c.strip()]
+
+class MemoryClient:
+    def __init__(self):
+        self.tables = {name: {} for name in SCHEMA}  # table -> id -> row
+        self.next_id = {name: 1 for name in SCHEMA}
+        self.indexes = {name: {column: {} for column in INDEXED} for name in SCHEMA}  # value -> ids
+        self.lock = threading.Lock()
+
+    def table(self, name: str) -> Query:
+        return Query(self, name)
+
+    def rpc(self, name: str, params: dict):
+        raise NotImplementedError(f"Postgres function {name} is only available on Supabase")
+
+    def close(self):
+        pass
+
+    def run(self, query: Query) -> list:
+        with self.lock:
+            if query.http_method == "GET":
+                columns = _columns(query)
+                rows = self._matching(query)
+                if columns is None:
+                    return [dict(row) for row in rows]
+                return [{c: row.get(c) for c in columns} for row in rows]
+            if query.http_method == "POST":
+                return [dict(self._write(query, row)) for row in query.payload]
+            if query.http_method == "PATCH":
+                updated = []
+                for row in self._matching(query):
+                    self._index(query.table_name, row, add=False)
+                    row.update(query.payload)
+                    self._index(query.table_name, row, add=True)
+                    updated.append(dict(row))
+                return updated
+            deleted = []
+            for row in self._matching(query):
+                self._index(query.table_name, row, add=False)
+                deleted.append(self.tables[query.table_name].pop(row["id"]))
+            return deleted
+
+    def _index(self, table_name: str, row: dict, add: bool):
+        for column, index in self.indexes[table_name].items():
+            if column in row:
+                ids = index.setdefault(row[column], set())
+                if add:
+                    ids.add(row["id"])
+                else:
+                    ids.discard(row["id"])
+
+    def _matching(self, query: Query) -> list:
+        rows = self.tables[query.table_name]
+        candidates = rows.values()
+        # Narrow down with the first equality filter on the id or an indexed column
+        for op, column, value in query.filters:
+            values = [value] if op == "eq" else dict.fromkeys(value) if op == "in" else None
+            if values is None:
+                continue
+            if column == "id":
+                candidates = [rows[v] for v in values if v in rows]
+                break
+            if column in INDEXED:
+                index = self.indexes[query.table_name][column]
+                candidates = [rows[i] for v in values for i in index.get(v, ())]
+                break
+
+        matched = [row for row in candidates if all(_test(row, f) for f in query.filters)]
+        if query.order_by is not None:
+            column, desc = query.order_by
+            # Nulls last, like Postgres in ascending order
+            matched.sort(key=lambda row: (row.get(column) is None, row.get(column)), reverse=desc)
+        if query.limit_to is not None:
+            matched = matched[:query.limit_to]
+        return matched
+
+    def _write(self, query: Query, new: dict) -> dict:
+        rows = self.tables[query.table_name]
+        if query.on_conflict:
+            keys = query.on_conflict
+            if keys == ["id"]:
+                existing = rows.get(new.get("id"))
+            else:
+                candidates = rows.values()
+                indexed = [k for k in keys if k in INDEXED]
+                if indexed:
+                    ids = self.indexes[query.table_name][indexed[0]].get(new.get(indexed[0]), ())
+                    candidates = [rows[i] for i in ids]
+                existing = next((r for r in candidates if all(r.get(k) == new.get(k) for k in keys)), None)
+            if existing is not None:
+                self._index(query.table_name, existing, add=False)
+                existing.update(new)
+                self._index(query.table_name, existing, add=True)
+                return existing
+
+        row = dict(new)
+        if row.get("id") is None:
+            row["id"] = self.next_id[query.table_name]
+        elif row["id"] in rows:
+            raise ValueError(f"duplicate key value violates unique constraint \"{query.table_name}_pkey\"")
+        self.next_id[query.table_name] = max(self.next_id[query.table_name], row["id"] + 1)
+        rows[row["id"]] = row
+        self._index(query.table_name, row, add=True)
+        return row
+
+def _test(row: dict, condition) -> bool:
+    op, column, value = condition
+    current = row.get(column)
+    if op == "eq":
+        return current == value
+    if op == "neq":
+        return current != value
+    if op == "in":
+        return current in value
+    if op == "is":
+        return current is value
+    if current is None:
+        return False
+    if op == "gt":
+        return current > value
+    if op == "gte":
+        return current >= value
+    if op == "lt":
+        return current < value
+    return current <= value
+
+SQL_OPS = {"eq": "=", "neq": "!=", "gt": ">", "gte": ">=", "lt": "<", "lte": "<="}
+
+class SQLiteClient:
+    """One connection shared by the database thread pool; SQLite serializes writes anyway."""
+
+    def __init__(self, path: str):
+        self.connection = sqlite3.connect(path, check_same_thread=False, isolation_level=None)
+        self.connection.row_factory = sqlite3.Row
+        self.lock = threading.Lock()
+        self.connection.execute("PRAGMA journal_mode=WAL")
+        self._create_schema()
+
+    def _create_schema(self):
+        for name, columns in SCHEMA.items():
+            definition = ", ".join(f'"{column}" {kind}' for column, kind in columns.items())
+            self.connection.execute(f'CREATE TABLE IF NOT EXISTS "{name}" (id INTEGER PRIMARY KEY AUTOINCREMENT, {definition})')
+            for column in INDEXED:
+                if column in columns:
+                    self.connection.execute(f'CREATE INDEX IF NOT EXISTS "{name}_{column}_idx" ON "{name}" ("{column}")')
+            if name in UNIQUE:
+                key = ", ".join(f'"{column}"' for column in UNIQUE[name])
+                self.connection.execute(f'CREATE UNIQUE INDEX IF NOT EXISTS "{name}_unique_idx" ON "{name}" ({key})')
+
+    def table(self, name: str) -> Query:
+        return Query(self, name)
+
+    def rpc(self, name: str, params: dict):
+        raise NotImplementedError(f"Postgres function {name} is only available on Supabase")
+
+    def close(self):
+        self.connection.close()
+
+    def run(self, query: Query) -> list:
+        sql, params = self._compile(query)
+        with self.lock:
+            if query.http_method == "POST":
+                # One statement per row, in a transaction, as PostgREST inserts a batch atomically
+                rows = []
+                with self.connection:
+                    self.connection.execute("BEGIN")
+                    for row_params in params:
+                        rows.extend(self.connection.execute(sql, row_params).fetchall())
+            else:
+                rows = self.connection.execute(sql, params).fetchall()
+        booleans = [c for c, kind in SCHEMA[query.table_name].items() if kind.startswith("BOOLEAN")]
+        result = []
+        for row in rows:
+            row = dict(row)
+            for column in booleans:
+                if row.get(column) is not None:
+                    row[column] = bool(row[column])
+            result.append(row)
+        return result
+
+    def _compile(self, query: Query):
+        table_name = f'"{query.table_name}"'
+        columns = _columns(query)
+        returning = "*" if columns is None else ", ".join(f'"{c}"' for c in columns)
+
+        if query.http_method == "POST":
+            keys = sorted({key for row in query.payload for key in row})
+            names = ", ".join(f'"{k}"' for k in keys)
+            sql = f'INSERT INTO {table_name} ({names}) VALUES ({", ".join("?" for _ in keys)})'
+            if query.on_conflict:
+                updates = ", ".join(f'"{k}" = excluded."{k}"' for k in keys if k not in query.on_conflict)
+                target = ", ".join(f'"{k}"' for k in query.on_conflict)
+                sql += f" ON CONFLICT ({target}) DO " + (f"UPDATE SET {updates}" if updates else "NOTHING")
+            return sql + " RETURNING *", [[row.get(k) for k in keys] for row in query.payload]
+
+        where, params = self._where(query)
+        if query.http_method == "PATCH":
+            assignments = ", ".join(f'"{k}" = ?' for k in query.payload)
+            return f"UPDATE {table_name} SET {assignments}{where} RETURNING *", list(query.payload.values()) + params
+        if query.http_method == "DELETE":
+            return f"DELETE FROM {table_name}{where} RETURNING *", params
+
+        sql = f"SELECT {returning} FROM {table_name}{where}"
+        if query.order_by is not None:
+            column, desc = query.order_by
+            sql += f' ORDER BY "{column}" {"DESC" if desc else "ASC"}'
+        if query.limit_to is not None:
+            sql += f" LIMIT {int(query.limit_to)}"
+        return sql, params
+
+    def _where(self, query: Query):
+        clauses, params = [], []
+        for op, column, value in query.filters:
+            if op == "in":
+                clauses.append(f'"{column}" IN ({", ".join("?" for _ in value)})')
+                params.extend(value)
+            elif op == "is":
+                clauses.append(f'"{column}" IS ?')
+                params.append(value)
+            else:
+                clauses.append(f'"{column}" {SQL_OPS[op]} ?')
+                params.append(value)
+        return (" WHERE " + " AND ".join(clauses) if clauses else ""), params
+
+def create_local_client(backend: str, path: str = ":memory:"):
+    if backend == "memory":
+        return MemoryClient()
+    if backend == "sqlite":
+        return SQLiteClient(path)
+    raise ValueError(f"Unknown STORAGE_BACKEND {backend!r}; use supabase, memory or sqlite")
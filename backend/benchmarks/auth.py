@@ -0,0 +1,82 @@
+"""
+Benchmark of the per-request cost of authentication (app/auth.py).
+
+Compares, per request:
+
+  - lookup:   checking credentials against Personnels, as authorize-personnel
+              did on every call (benchmarks.fake_supabase with --latency-ms
+              per round trip)
+  - decode:   verifying a bearer token's HS256 signature and claims
+  - cached:   a token found in the verified-claims LRU
+
+and the one-off cost of hashing a password at login.
+
+Run from the backend directory:
+
+    python -m benchmarks.auth --tokens 1000 --requests 100000
+"""
+import argparse
+import os
+import time
+
+os.environ.setdefault("SUPABASE_JWT_SECRET", "bench-secret-bench-secret-bench-secret")
+
+from app.auth import TokenVerifier, create_token, hash_password, verify_password  # noqa: E402
+from benchmarks.fake_supabase import FakeClient  # noqa: E402
+
+
+def per_call_us(fn, count):
+    start = time.perf_counter()
+    for i in range(count):
+        fn(i)
+    return (time.perf_counter() - start) / count * 1e6
+
+
+def main():
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--tokens", type=int, default=1000, help="distinct users sending requests")
+    parser.add_argument("--requests", type=int, default=100_000)
+    parser.add_argument("--latency-ms", type=float, default=20, help="simulated database round trip")
+    parser.add_argument("--lookups", type=int, default=200)
+    args = parser.parse_args()
+
+    client = FakeClient()
+    client.table("Personnels").insert(
+        [{"email": f"person{i}@example.com", "password": f"secret{i}", "floor_id": 1} for i in range(args.tokens)]
+    ).execute()
+    client.latency = args.latency_ms / 1000
+
+    def lookup(i):
+        i %= args.tokens
+        rows = client.table("Personnels").select("*").eq("email", f"person{i}@example.com").eq("password", f"secret{i}").execute()
+        assert rows.data
+    lookup_us = per_call_us(lookup, args.lookups)
+
+    tokens = [create_token({"id": i, "email": f"person{i}@example.com", "floor_id": 1}) for i in range(args.tokens)]
+
+    uncached = TokenVerifier(max_entries=0)
+    decode_us = per_call_us(lambda i: uncached.verify(tokens[i % len(tokens)]), min(args.requests, 20_000))
+
+    cached = TokenVerifier(max_entries=len(tokens))
+    for token in tokens:
+        cached.verify(token)
+    cached_us = per_call_us(lambda i: cached.verify(tokens[i % len(tokens)]), args.requests)
+
+    start = time.perf_counter()
+    stored = hash_password("correct horse battery staple")
+    hash_ms = (time.perf_counter() - start) * 1000
+    start = time.perf_counter()
+    verify_password("correct horse battery staple", stored)
+    verify_ms = (time.perf_counter() - start) * 1000
+
+    print(f"{args.tokens} distinct tokens, {args.requests} requests")
+    print(f"{'per request':>28} {'us':>10}")
+    print(f"{'lookup (1 DB round trip)':>28} {lookup_us:>10.1f}")
+    print(f"{'decode (signature check)':>28} {decode_us:>10.1f}")
+    print(f"{'cached (verified LRU)':>28} {cached_us:>10.2f}")
+    print(f"cache hit ratio: {cached.hits / max(1, cached.hits + cached.misses):.4f}")
+    print(f"login only: hash {hash_ms:.0f} ms, verify {verify_ms:.0f} ms")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,75 @@
+"""
+Concurrency benchmark for the Supabase data-access layer.
+
+Simulates a Supabase round trip with a blocking query whose execute() sleeps
+for a fixed latency, then fires N concurrent "requests" at it:
+
+  - inline:   query.execute() called directly inside the coroutine (old behaviour)
+  - executor: await execute(query) from app.database (bounded thread pool)
+
+Run from the backend directory:
+
+    python -m benchmarks.concurrency --latency-ms 50 --requests 256
+"""
+import argparse
+import asyncio
+import os
+import time
+
+# app.database connects lazily on first use; it only needs well-formed settings.
+os.environ.setdefault("SUPABASE_URL", "http://localhost:54321")
+os.environ.setdefault("SUPABASE_KEY", "bench.bench.bench")
+
+from app import database  # noqa: E402
+
+
+class SlowQuery:
+    """Stand-in for a postgrest query builder whose execute() blocks."""
+
+    def __init__(self, latency: float):
+        self.latency = latency
+
+    def execute(self):
+        time.sleep(self.latency)
+        return []
+
+
+async def handler_inline(latency):
+    return SlowQuery(latency).execute()
+
+
+async def handler_executor(latency):
+    return await database.execute(SlowQuery(latency))
+
+
+async def run(handler, latency, total, in_flight):
+    semaphore = asyncio.Semaphore(in_flight)
+
+    async def one():
+        async with semaphore:
+            await handler(latency)
+
+    start = time.perf_counter()
+    await asyncio.gather(*(one() for _ in range(total)))
+    return total / (time.perf_counter() - start)
+
+
+async def main():
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--latency-ms", type=float, default=50)
+    parser.add_argument("--requests", type=int, default=256)
+    parser.add_argument("--in-flight", type=int, nargs="+", default=[1, 4, 16, 32, 64])
+    args = parser.parse_args()
+
+    latency = args.latency_ms / 1000
+    print(f"pool size: {database.SUPABASE_MAX_WORKERS}, simulated latency: {args.latency_ms} ms")
+    print(f"{'in-flight':>10} {'inline req/s':>14} {'executor req/s':>16}")
+    for in_flight in args.in_flight:
+        inline = await run(handler_inline, latency, args.requests, in_flight)
+        executor = await run(handler_executor, latency, args.requests, in_flight)
+        print(f"{in_flight:>10} {inline:>14.1f} {executor:>16.1f}")
+    database.database.close()
+
+
+if __name__ == "__main__":
+    asyncio.run(main())
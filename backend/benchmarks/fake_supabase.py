@@ -0,0 +1,86 @@
+"""
+In-process stand-in for the supabase client, for benchmarks and load tests.
+
+FakeClient is the in-memory storage engine (app.storage.MemoryClient) with a
+fixed latency injected into every execute(), like a round trip to the hosted
+database, and a count of those round trips.
+
+    client = FakeClient(latency=0.02)
+    seed(client, buildings=4, floors=10, desks=400, personnel=300)
+    install(client)   # app.database now talks to the fake
+"""
+import random
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+
+from app.storage import MemoryClient
+
+
+class FakeClient(MemoryClient):
+    def __init__(self, latency: float = 0.0):
+        super().__init__()
+        self.latency = latency
+        self.round_trips = 0
+        self._count_lock = threading.Lock()
+
+    def run(self, query):
+        if self.latency:
+            time.sleep(self.latency)
+        with self._count_lock:
+            self.round_trips += 1
+        return super().run(query)
+
+
+def seed(client: FakeClient, buildings: int = 4, floors: int = 10, desks: int = 400,
+         personnel: int = 300, feedbacks: int = 1000, seed: int = 7):
+    """
+    Fill the fake with `buildings` buildings of `floors` floors each. Every
+    floor has rows of 2x1 desks separated by aisles, a kitchen and a WC, and
+    `personnel` people, most of them seated at a desk.
+    """
+    rng = random.Random(seed)
+    latency, client.latency = client.latency, 0.0
+    width, length = 120, 80
+    people = []
+    for _ in range(buildings):
+        building = client.table("Buildings").insert({"floor_count": floors}).execute().data[0]
+        for number in range(1, floors + 1):
+            floor = client.table("Floors").insert({
+                "building_id": building["id"], "number": number,
+                "width": width, "length": length, "capacity": width * length,
+            }).execute().data[0]
+
+            cells = [(x, y) for y in range(2, length - 2, 3) for x in range(2, width - 2, 3)][:desks]
+            client.table("Objects").insert(
+                [{"state": True, "floor_id": floor["id"], "o_type": 5, "x_coor": x, "y_coor": y,
+                  "width": 2, "length": 1} for x, y in cells]
+                + [{"state": True, "floor_id": floor["id"], "o_type": 2, "x_coor": 0, "y_coor": 0, "width": 2, "length": 2},
+                   {"state": True, "floor_id": floor["id"], "o_type": 3, "x_coor": width - 2, "y_coor": 0, "width": 2, "length": 2}]
+            ).execute()
+
+            seats = rng.sample(cells, min(len(cells), int(personnel * 0.9)))
+            for i in range(personnel):
+                x, y = seats[i] if i < len(seats) else (None, None)
+                people.append({
+                    "name": f"Name{len(people)}", "surname": f"Surname{len(people)}",
+                    "email": f"person{len(people)}@example.com", "password": "secret",
+                    "floor_id": floor["id"], "gender": rng.randint(0, 1), "x_coor": x, "y_coor": y,
+                })
+    client.table("Personnels").insert(people).execute()
+    client.table("Feedbacks").insert([
+        {"title": f"Feedback {i}", "personnelId": rng.randint(1, len(people)), "feedback": "The room is too cold"}
+        for i in range(feedbacks)
+    ]).execute()
+    client.round_trips = 0
+    client.latency = latency
+
+
+def install(client: FakeClient, workers: int = None):
+    """Point app.database at the fake client instead of Supabase."""
+    from app.database import database
+    from app.config import SUPABASE_MAX_WORKERS
+
+    database.close()
+    database.client = client
+    database.executor = ThreadPoolExecutor(max_workers=workers or SUPABASE_MAX_WORKERS, thread_name_prefix="fake-supabase")
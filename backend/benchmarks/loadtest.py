@@ -0,0 +1,132 @@
+"""
+Load test of the key endpoints against an in-process Supabase stand-in.
+
+Seeds benchmarks.fake_supabase with buildings, floors, objects and personnel,
+injects a fixed latency into every database round trip, then drives the
+FastAPI app in-process (httpx ASGITransport) with a fixed number of requests
+in flight per scenario. Reports throughput, p50/p95/p99 latency and database
+round trips per request, so regressions in any of them show up.
+
+Run from the backend directory:
+
+    python -m benchmarks.loadtest --latency-ms 20 --requests 200 --concurrency 16
+    python -m benchmarks.loadtest --no-cache   # every read goes to the database
+"""
+import argparse
+import asyncio
+import os
+import random
+import time
+
+# app.database connects lazily on first use; it only needs well-formed settings.
+os.environ.setdefault("SUPABASE_URL", "http://localhost:54321")
+os.environ.setdefault("SUPABASE_KEY", "bench.bench.bench")
+
+import httpx  # noqa: E402
+
+from app.main import app  # noqa: E402
+from app.cache import cache, MemoryCache  # noqa: E402
+from benchmarks.fake_supabase import FakeClient, seed, install  # noqa: E402
+
+
+def percentile(sorted_values, p):
+    if not sorted_values:
+        return 0.0
+    k = min(len(sorted_values) - 1, max(0, round(p / 100 * (len(sorted_values) - 1))))
+    return sorted_values[k]
+
+
+def scenarios(fake, rng):
+    """name -> function(i) returning (method, url, json body) for the i-th request."""
+    building_ids = list(fake.tables["Buildings"])
+    floor_ids = list(fake.tables["Floors"])
+
+    def new_object(i):
+        # Spread over the floors and fill rows below the seeded desks (y >= 40), so placements never collide
+        k = i // len(floor_ids)
+        return {"state": True, "floor_id": floor_ids[i % len(floor_ids)], "o_type": 5,
+                "x_coor": 2 * (k % 50), "y_coor": 40 + k // 50, "width": 1, "length": 1}
+
+    return {
+        "fetch-floors-with-personnels": lambda i: (
+            "GET", f"/fetch-floors-with-personnels/{rng.choice(building_ids)}", None),
+        "fetch-objects/?building_id=": lambda i: (
+            "GET", f"/fetch-objects/?building_id={rng.choice(building_ids)}", None),
+        "create-floor": lambda i: (
+            "POST", "/create-floor",
+            {"floors": [{"width": 120, "length": 80}] * 10, "totalSquareMeters": 96000}),
+        "create-floor?background=true": lambda i: (
+            "POST", "/create-floor?background=true",
+            {"floors": [{"width": 120, "length": 80}] * 50, "totalSquareMeters": 480000}),
+        "create-object": lambda i: ("POST", "/create-object", new_object(i)),
+    }
+
+
+async def run_scenario(client, fake, make_request, total, concurrency):
+    semaphore = asyncio.Semaphore(concurrency)
+    latencies = []
+    errors = 0
+
+    async def one(i):
+        nonlocal errors
+        method, url, body = make_request(i)
+        async with semaphore:
+            start = time.perf_counter()
+            response = await client.request(method, url, json=body)
+            latencies.append((time.perf_counter() - start) * 1000)
+            if response.status_code >= 400:
+                errors += 1
+
+    round_trips = fake.round_trips
+    start = time.perf_counter()
+    await asyncio.gather(*(one(i) for i in range(total)))
+    elapsed = time.perf_counter() - start
+    latencies.sort()
+    return {
+        "rps": total / elapsed,
+        "p50": percentile(latencies, 50),
+        "p95": percentile(latencies, 95),
+        "p99": percentile(latencies, 99),
+        "round_trips": (fake.round_trips - round_trips) / total,
+        "errors": errors,
+    }
+
+
+async def main():
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--latency-ms", type=float, default=20)
+    parser.add_argument("--requests", type=int, default=200)
+    parser.add_argument("--concurrency", type=int, default=16)
+    parser.add_argument("--buildings", type=int, default=4)
+    parser.add_argument("--floors", type=int, default=10)
+    parser.add_argument("--desks", type=int, default=400)
+    parser.add_argument("--personnel", type=int, default=300)
+    parser.add_argument("--no-cache", action="store_true", help="disable the read-through cache")
+    parser.add_argument("--only", nargs="+", help="scenarios to run (default: all)")
+    parser.add_argument("--seed", type=int, default=7)
+    args = parser.parse_args()
+
+    fake = FakeClient(latency=args.latency_ms / 1000)
+    seed(fake, args.buildings, args.floors, args.desks, args.personnel, seed=args.seed)
+    install(fake)
+    if args.no_cache:
+        cache.backend = MemoryCache(max_entries=0)
+
+    rng = random.Random(args.seed)
+    print(f"{args.buildings} buildings x {args.floors} floors, {args.desks} desks and {args.personnel} "
+          f"personnel per floor; {args.latency_ms} ms per round trip, {args.concurrency} in flight, "
+          f"cache {'off' if args.no_cache else 'on'}")
+    print(f"{'scenario':>30} {'req/s':>8} {'p50 ms':>8} {'p95 ms':>8} {'p99 ms':>8} {'trips/req':>10} {'errors':>7}")
+
+    transport = httpx.ASGITransport(app=app)
+    async with httpx.AsyncClient(transport=transport, base_url="http://loadtest", timeout=None) as client:
+        for name, make_request in scenarios(fake, rng).items():
+            if args.only and name not in args.only:
+                continue
+            r = await run_scenario(client, fake, make_request, args.requests, args.concurrency)
+            print(f"{name:>30} {r['rps']:>8.1f} {r['p50']:>8.1f} {r['p95']:>8.1f} {r['p99']:>8.1f} "
+                  f"{r['round_trips']:>10.2f} {r['errors']:>7}")
+
+
+if __name__ == "__main__":
+    asyncio.run(main())
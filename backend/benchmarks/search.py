@@ -0,0 +1,80 @@
+"""
+Benchmark of feedback search (app/search.py) as the table grows.
+
+Indexes --feedbacks synthetic complaints (a few topic words among filler
+drawn from a Zipf-like vocabulary of --vocabulary words), then times searches of one and two
+words, a prefix search and a search restricted to a few authors, against a
+linear scan of every row (what filtering client-side amounts to).
+
+Run from the backend directory:
+
+    python -m benchmarks.search --feedbacks 50000
+"""
+import argparse
+import random
+import time
+
+from app.search import FeedbackIndex, tokenize
+
+TOPICS = ("air conditioning cold hot noise light desk chair window door printer coffee kitchen "
+         "elevator parking wifi network meeting room booked clean dirty broken smell loud quiet "
+         "screen monitor cable socket heating water leak toilet stairs badge access lock").split()
+
+
+def per_call_ms(fn, count):
+    start = time.perf_counter()
+    for _ in range(count):
+        fn()
+    return (time.perf_counter() - start) / count * 1000
+
+
+def main():
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--feedbacks", type=int, default=50_000)
+    parser.add_argument("--personnel", type=int, default=2_000)
+    parser.add_argument("--vocabulary", type=int, default=5_000)
+    parser.add_argument("--repeat", type=int, default=200)
+    parser.add_argument("--seed", type=int, default=7)
+    args = parser.parse_args()
+
+    rng = random.Random(args.seed)
+    filler = [f"w{k}" for k in range(args.vocabulary)]
+    weights = [1 / (k + 1) for k in range(args.vocabulary)]
+
+    def text(topics, words):
+        return " ".join(rng.sample(TOPICS, topics) + rng.choices(filler, weights, k=words))
+
+    rows = [
+        {"id": i, "personnelId": rng.randrange(args.personnel),
+         "title": text(2, 1), "feedback": text(3, rng.randint(10, 60))}
+        for i in range(1, args.feedbacks + 1)
+    ]
+
+    index = FeedbackIndex()
+    start = time.perf_counter()
+    for row in rows:
+        index.add(row)
+    build_s = time.perf_counter() - start
+
+    def scan(query):
+        words = tokenize(query)
+        hits = [r for r in rows if all(w in tokenize(r["title"] + " " + r["feedback"]) for w in words)]
+        return hits[:20]
+
+    authors = set(range(10))
+    cases = {
+        "one word": lambda: index.search("printer"),
+        "two words": lambda: index.search("broken printer"),
+        "prefix": lambda: index.search("broken pri"),
+        "two words, 10 authors": lambda: index.search("broken printer", authors),
+    }
+
+    print(f"{args.feedbacks} feedbacks, {len(index.postings)} words; index built in {build_s:.2f} s")
+    print(f"{'query':>24} {'ms':>8}")
+    for name, fn in cases.items():
+        print(f"{name:>24} {per_call_ms(fn, args.repeat):>8.3f}")
+    print(f"{'linear scan, two words':>24} {per_call_ms(lambda: scan('broken printer'), 3):>8.1f}")
+
+
+if __name__ == "__main__":
+    main()
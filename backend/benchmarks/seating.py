@@ -0,0 +1,72 @@
+"""
+Benchmark for the automatic seating planner (app/seating.py).
+
+Generates a floor with rows of desks and a pool of unplaced personnel split
+into teams, then times plan_seating for each strategy.
+
+Run from the backend directory:
+
+    python -m benchmarks.seating --desks 5000 --people 4000 --teams 25
+"""
+import argparse
+import random
+import time
+
+from app.seating import plan_seating
+
+
+def make_desks(count, seed):
+    """Desk cells in rows of 2-cell-deep desk blocks separated by aisles, like an open office."""
+    rng = random.Random(seed)
+    desks = []
+    y = 0
+    while len(desks) < count:
+        for x in range(0, 400):
+            if x % 10 == 9:  # aisle
+                continue
+            desks.append((x, y))
+            desks.append((x, y + 1))
+        y += 3
+    rng.shuffle(desks)
+    return desks[:count]
+
+
+def team_spread(plan, teams):
+    """Mean distance of a person to their team centroid."""
+    members = {}
+    for p, cell in plan:
+        members.setdefault(teams[p], []).append(cell)
+    total, n = 0.0, 0
+    for cells in members.values():
+        cx = sum(x for x, _ in cells) / len(cells)
+        cy = sum(y for _, y in cells) / len(cells)
+        total += sum(((x - cx) ** 2 + (y - cy) ** 2) ** 0.5 for x, y in cells)
+        n += len(cells)
+    return total / n
+
+
+def main():
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--desks", type=int, default=5000)
+    parser.add_argument("--people", type=int, default=4000)
+    parser.add_argument("--teams", type=int, default=25)
+    parser.add_argument("--seed", type=int, default=7)
+    args = parser.parse_args()
+
+    rng = random.Random(args.seed)
+    desks = make_desks(args.desks, args.seed)
+    people = list(range(1, args.people + 1))
+    teams = {p: f"team-{rng.randrange(args.teams)}" for p in people}
+
+    print(f"{args.desks} desks, {args.people} people, {args.teams} teams")
+    print(f"{'strategy':>18} {'ms':>9} {'placed':>8} {'team spread':>12}")
+    for strategy in ("compact", "spread"):
+        for label, team_map in ((strategy, None), (f"{strategy}+teams", teams)):
+            start = time.perf_counter()
+            plan = plan_seating(desks, people, team_map, strategy)
+            elapsed = (time.perf_counter() - start) * 1000
+            print(f"{label:>18} {elapsed:>9.1f} {len(plan):>8} {team_spread(plan, teams):>12.1f}")
+
+
+if __name__ == "__main__":
+    main()
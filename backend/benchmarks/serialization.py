@@ -0,0 +1,74 @@
+"""
+Benchmark for JSON rendering and compression of large layout payloads (app/responses.py).
+
+Builds the rows fetch-objects/?building_id= returns for a building with
+--objects objects, then compares FastAPI's default path (jsonable_encoder +
+JSONResponse) with FastJSONResponse, and the bytes on the wire with gzip.
+
+Run from the backend directory:
+
+    python -m benchmarks.serialization --objects 100000
+"""
+import argparse
+import gzip
+import random
+import time
+
+from fastapi.encoders import jsonable_encoder
+from fastapi.responses import JSONResponse
+
+from app.responses import FastJSONResponse, orjson
+
+
+def make_objects(count, floors, seed):
+    rng = random.Random(seed)
+    return [
+        {
+            "id": i,
+            "state": rng.random() < 0.5,
+            "floor_id": 1 + i % floors,
+            "o_type": rng.randint(1, 5),
+            "x_coor": rng.randrange(500),
+            "y_coor": rng.randrange(500),
+            "width": rng.randint(1, 4),
+            "length": rng.randint(1, 2),
+        }
+        for i in range(1, count + 1)
+    ]
+
+
+def best_ms(fn, repeat):
+    best = float("inf")
+    for _ in range(repeat):
+        start = time.perf_counter()
+        result = fn()
+        best = min(best, time.perf_counter() - start)
+    return best * 1000, result
+
+
+def main():
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--objects", type=int, default=100_000)
+    parser.add_argument("--floors", type=int, default=20)
+    parser.add_argument("--repeat", type=int, default=5)
+    parser.add_argument("--seed", type=int, default=7)
+    args = parser.parse_args()
+
+    rows = make_objects(args.objects, args.floors, args.seed)
+    print(f"{args.objects} objects, renderer: {'orjson' if orjson else 'stdlib json (orjson not installed)'}")
+
+    print(f"{'path':>30} {'ms':>9} {'bytes':>11}")
+    default_ms, body = best_ms(lambda: JSONResponse(jsonable_encoder(rows)).body, args.repeat)
+    print(f"{'jsonable_encoder + json':>30} {default_ms:>9.1f} {len(body):>11}")
+    fast_ms, fast_body = best_ms(lambda: FastJSONResponse(rows).body, args.repeat)
+    print(f"{'FastJSONResponse':>30} {fast_ms:>9.1f} {len(fast_body):>11}")
+    print(f"{'speedup':>30} {default_ms / fast_ms:>9.1f}x")
+
+    for level in (1, 5, 9):
+        gzip_ms, compressed = best_ms(lambda: gzip.compress(fast_body, compresslevel=level), args.repeat)
+        ratio = len(fast_body) / len(compressed)
+        print(f"{f'gzip level {level}':>30} {gzip_ms:>9.1f} {len(compressed):>11}  ({ratio:.1f}x smaller)")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,28 @@
+-- Creates a building and all of its floors in one transaction.
+-- Used by POST /create-floor when CREATE_BUILDING_RPC=true.
+--
+-- floors: JSON array of Floors rows ({"length", "width", "capacity"}), read with
+-- the table's own column types; floors are numbered 1..N in array order and
+-- any building_id or number in the input is ignored.
+create or replace function create_building_with_floors(floors jsonb)
+returns json
+language plpgsql
+as $$
+declare
+    new_building_id bigint;
+begin
+    insert into "Buildings" (floor_count)
+    values (jsonb_array_length(floors))
+    returning id into new_building_id;
+
+    insert into "Floors" (building_id, number, length, width, capacity)
+    select new_building_id,
+           f.ordinality,
+           coalesce(f.length, 0),
+           coalesce(f.width, 0),
+           f.capacity
+    from jsonb_populate_recordset(null::"Floors", floors) with ordinality as f;
+
+    return json_build_object('building_id', new_building_id, 'floor_count', jsonb_array_length(floors));
+end;
+$$;
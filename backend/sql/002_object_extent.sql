@@ -0,0 +1,14 @@
+-- Store each piece of furniture as a single rectangle instead of one row per cell.
+-- (x_coor, y_coor) is the top-left cell; the object spans `width` cells along x
+-- and `length` cells along y.
+--
+-- Existing rows are single cells, which is exactly a 1x1 rectangle, so they stay
+-- valid as they are. Clients that still expect one row per cell can request
+-- ?expand=cells on fetch-objects / fetch-placed-objects.
+alter table "Objects" add column if not exists width integer not null default 1;
+alter table "Objects" add column if not exists length integer not null default 1;
+
+alter table "Objects" drop constraint if exists objects_extent_positive;
+alter table "Objects" add constraint objects_extent_positive check (width > 0 and length > 0);
+
+create index if not exists objects_floor_id_idx on "Objects" (floor_id);
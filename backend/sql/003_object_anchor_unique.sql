@@ -0,0 +1,14 @@
+-- One object per top-left cell of a floor, so placements can be written as an
+-- upsert on (floor_id, x_coor, y_coor) (POST /create-or-update-objects/{floor_id}).
+--
+-- Older clients may have stored the same cell twice; keep the newest row of each
+-- duplicate before adding the constraint.
+delete from "Objects" a
+using "Objects" b
+where a.floor_id = b.floor_id
+  and a.x_coor = b.x_coor
+  and a.y_coor = b.y_coor
+  and a.id < b.id;
+
+alter table "Objects" drop constraint if exists objects_floor_anchor_key;
+alter table "Objects" add constraint objects_floor_anchor_key unique (floor_id, x_coor, y_coor);
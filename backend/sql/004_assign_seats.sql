@@ -0,0 +1,16 @@
+-- Moves personnel to new seats in one statement, touching only the seat columns.
+-- Used by POST /assign-seats/ on Supabase unless ASSIGN_SEATS_RPC=false.
+--
+-- assignments: JSON array of {"id", "floor_id", "x_coor", "y_coor"}.
+-- Returns the ids that were updated; personnel deleted in the meantime are
+-- skipped, never re-created.
+create or replace function assign_seats(assignments jsonb)
+returns table (id bigint)
+language sql
+as $$
+    update "Personnels" as p
+    set floor_id = a.floor_id, x_coor = a.x_coor, y_coor = a.y_coor
+    from jsonb_to_recordset(assignments) as a(id bigint, floor_id bigint, x_coor int, y_coor int)
+    where p.id = a.id
+    returning p.id;
+$$;
@@ -77,7 +77,7 @@ const FloorPlan1: React.FC<FloorPlanProps> = ({ floorId }) => {
 
     const fetchPlacedObjects = async () => {
       try {
-        const response = await axios.get(`http://localhost:8000/fetch-placed-objects/${floorId}`);
+        const response = await axios.get(`http://localhost:8000/fetch-placed-objects/${floorId}?expand=cells`);
         const placedObjects: DroppedItem[] = response.data;
 
         // Populate grid with existing objects
@@ -177,26 +177,41 @@ const FloorPlan1: React.FC<FloorPlanProps> = ({ floorId }) => {
   // Determine state: Tables = true, Others = false
   const isTable = newItem.name.includes("Workspace");
 
-  // Make multiple API calls for each position covered by the object
-  for (let r = row; r < row + itemData.height; r++) {
-    for (let c = col; c < col + itemData.width; c++) {
-      try {
-        await axios.post(
-          "http://localhost:8000/create-or-update-object/",
+  // Undo the optimistic placement when the backend rejects it
+  const removeFromGrid = () => {
+    setItemsInCells((prevGrid) => prevGrid.map((cell) => (cell === newItem ? null : cell)));
+  };
+
+  // Save the whole item as one placement covering width x height cells
+  try {
+    const response = await axios.post(
+      `http://localhost:8000/create-or-update-objects/${floorId}`,
+      {
+        placements: [
           {
             state: isTable, // True for tables, False otherwise
-            floor_id: floorId,
             o_type: objectType, // Map from predefined types
-            x_coor: c,
-            y_coor: r,
+            x_coor: col,
+            y_coor: row,
+            width: itemData.width,
+            length: itemData.height,
           },
-          { headers: { "Content-Type": "application/json" } }
-        );
-        console.log(`Object placed at x: ${c}, y: ${r}`);
-      } catch (error) {
-        console.error("Failed to save object placement:", error);
-      }
+        ],
+      },
+      { headers: { "Content-Type": "application/json" } }
+    );
+    // Rejected placements still come back as HTTP 200, with the reason per item
+    const result = response.data?.results?.[0];
+    if (result?.status === "error") {
+      removeFromGrid();
+      console.error("Object placement rejected:", result.detail);
+      alert(`Could not place ${newItem.name}: ${result.detail}`);
+      return;
     }
+    console.log(`Object placed at x: ${col}, y: ${row}`);
+  } catch (error) {
+    removeFromGrid();
+    console.error("Failed to save object placement:", error);
   }
 };
 
@@ -1,5 +1,6 @@
 import React, { useEffect, useState } from "react";
 import axios from "axios";
+import { fetchAllPages } from "../fetchAllPages";
 
 interface FloorPlanProps {
   floorId: number;
@@ -48,8 +49,7 @@ const FloorPlan2: React.FC<FloorPlanProps> = ({ floorId }) => {
 
     const fetchObjectsAndPersonnel = async () => {
       try {
-        const objectsResponse = await axios.get(`http://localhost:8000/fetch-objects/?floor_id=${floorId}`);
-        const objects: DroppedItem[] = objectsResponse.data;
+        const objects = await fetchAllPages<DroppedItem>(`http://localhost:8000/fetch-objects/?floor_id=${floorId}&expand=cells`);
 
         const staffResponse = await axios.get(`http://localhost:8000/fetch-staff-personnel/${floorId}`);
         const staffMembers = staffResponse.data;
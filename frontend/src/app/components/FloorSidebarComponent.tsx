@@ -1,5 +1,5 @@
 import React, { useState, useEffect } from "react";
-import axios from "axios";
+import { fetchAllPages } from "../fetchAllPages";
 
 interface Floor {
   id: number;
@@ -31,13 +31,12 @@ const FloorSidebarComponent: React.FC<FloorSidebarProps> = ({ onSelect }) => {
   useEffect(() => {
     const fetchBuildingsAndFloors = async () => {
       try {
-        const buildingsResponse = await axios.get("http://localhost:8000/fetch-buildings");
-        setBuildings(buildingsResponse.data);
+        const buildings = await fetchAllPages<Building>("http://localhost:8000/fetch-buildings");
+        setBuildings(buildings);
 
-        if (buildingsResponse.data.length > 0) {
-          setCurrentBuilding(buildingsResponse.data[0].id);
-          const floorsResponse = await axios.get("http://localhost:8000/fetch-floors");
-          setFloors(floorsResponse.data);
+        if (buildings.length > 0) {
+          setCurrentBuilding(buildings[0].id);
+          setFloors(await fetchAllPages<Floor>("http://localhost:8000/fetch-floors"));
         }
       } catch (err) {
         console.error("Error fetching data:", err);
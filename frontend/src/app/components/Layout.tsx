@@ -44,7 +44,8 @@ const Layout = ({ children }: LayoutProps) => {
   useEffect(() => {
     const fetchFloors = async () => {
       try {
-        const response = await axios.get('http://localhost:8000/fetch-floors');
+        // Only the first floor is needed, so one row is enough
+        const response = await axios.get('http://localhost:8000/fetch-floors?limit=1');
         const floors = response.data;
 
         if (floors && floors.length > 0) {
@@ -1,5 +1,5 @@
 import React, { useEffect, useState } from "react";
-import axios from "axios";
+import { fetchAllPages } from "../fetchAllPages";
 
 interface PersonnelMenuProps {
   cellSize: number;
@@ -21,9 +21,9 @@ const PersonnelMenu: React.FC<PersonnelMenuProps> = ({ cellSize }) => {
   // Fetch personnel data and filter out those with non-null coordinates
   const fetchPersonnel = async () => {
     try {
-      const response = await axios.get("http://localhost:8000/fetch-unplaced-users");
+      const unplaced = await fetchAllPages<PersonnelData>("http://localhost:8000/fetch-unplaced-users");
       // Filter out personnel with both x_coor and y_coor not null
-      const filteredPersonnel = response.data.filter((person: PersonnelData) =>
+      const filteredPersonnel = unplaced.filter((person: PersonnelData) =>
         person.x_coor === null && person.y_coor === null
       );
       setPersonnel(filteredPersonnel);
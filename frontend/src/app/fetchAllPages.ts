@@ -0,0 +1,15 @@
+// src/app/fetchAllPages.ts
+import axios from 'axios';
+
+// GET every row of a paginated list endpoint, following the X-Next-Cursor header
+// until the last page.
+export async function fetchAllPages<T = any>(url: string): Promise<T[]> {
+  const rows: T[] = [];
+  let cursor: string | undefined;
+  do {
+    const response = await axios.get(url, { params: cursor ? { cursor } : undefined });
+    rows.push(...response.data);
+    cursor = response.headers['x-next-cursor'];
+  } while (cursor);
+  return rows;
+}
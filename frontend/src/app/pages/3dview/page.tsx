@@ -3,6 +3,7 @@
 import { useState, useEffect } from "react";
 import { Canvas } from "@react-three/fiber";
 import { OrbitControls, Text } from "@react-three/drei";
+import { fetchAllPages } from "../../fetchAllPages";
 
 // Helper function to generate grid cells
 const createGrid = (width, height) => {
@@ -108,8 +109,7 @@ export default function AllocationPage() {
   useEffect(() => {
     const fetchData = async () => {
       try {
-        const buildingsResponse = await fetch("http://localhost:8000/fetch-buildings");
-        const buildingsData = await buildingsResponse.json();
+        const buildingsData = await fetchAllPages("http://localhost:8000/fetch-buildings");
         setBuildings(buildingsData);
   
         if (selectedFloor) {
@@ -3,6 +3,7 @@
 import React, { useEffect, useState } from "react";
 import { useRouter } from "next/navigation";
 import { supabase } from "../../supabaseClient";
+import { fetchAllPages } from "../../fetchAllPages";
 
 interface Feedback {
   id: number;
@@ -72,8 +73,7 @@ export default function DashboardPage() {
   useEffect(() => {
     const fetchFeedbacks = async () => {
       try {
-        const response = await fetch("http://localhost:8000/fetch-feedbacks");
-        const data = await response.json();
+        const data = await fetchAllPages<Feedback>("http://localhost:8000/fetch-feedbacks");
         setFeedbacks(data);
 
         // Fetch personnel data for each feedback